@@ -0,0 +1,71 @@
+"""Collision broadphase benchmark: pygame all-pairs groupcollide vs the spatial hash.
+
+Runs shot-vs-enemy and player-vs-projectile queries from 10 to 10,000 entities and
+checks that both give the same hits. The play field grows with the entity count so
+the density stays the same as a crowded screen.
+
+    python benchmark_collisions.py
+"""
+import math
+import random
+import time
+import pygame
+from space_invaders_collision import SpatialHash, groupcollide, spritecollide
+
+ANTALL = (10, 100, 1000, 10000)
+RUNDER = 5
+
+
+class Boks(pygame.sprite.Sprite):
+    def __init__(self, x, y, bredde, hoyde):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, bredde, hoyde)
+
+
+def lag_scene(antall, rng):
+    # 3/4 enemies, 1/8 shots, 1/8 enemy projectiles, spread over a field scaled to the count
+    side = int(800 * math.sqrt(max(antall, 40) / 40))
+    fiender = pygame.sprite.Group(Boks(rng.randrange(side), rng.randrange(side), 40, 40)
+                                  for _ in range(antall * 3 // 4))
+    skudd = pygame.sprite.Group(Boks(rng.randrange(side), rng.randrange(side), 5, 15)
+                                for _ in range(max(1, antall // 8)))
+    prosjektiler = pygame.sprite.Group(Boks(rng.randrange(side), rng.randrange(side), 6, 15)
+                                       for _ in range(max(1, antall // 8)))
+    spiller = Boks(side // 2, side // 2, 50, 40)
+    return fiender, skudd, prosjektiler, spiller
+
+
+def tid(funksjon):
+    beste = float('inf')
+    for _ in range(RUNDER):
+        start = time.perf_counter()
+        resultat = funksjon()
+        beste = min(beste, time.perf_counter() - start)
+    return beste * 1000, resultat
+
+
+def main():
+    rng = random.Random(1)
+    fiende_hash = SpatialHash()
+    prosjektil_hash = SpatialHash()
+    print(f"{'entities':>9} {'all-pairs ms':>13} {'spatial hash ms':>16} {'speedup':>8}")
+    for antall in ANTALL:
+        fiender, skudd, prosjektiler, spiller = lag_scene(antall, rng)
+
+        def alle_par():
+            treff = pygame.sprite.groupcollide(skudd, fiender, False, False)
+            return treff, pygame.sprite.spritecollide(spiller, prosjektiler, False)
+
+        def hash_grid():
+            # Includes rebuilding the grids, as the game does every tick
+            treff = groupcollide(skudd, fiender, False, False, fiende_hash.build(fiender))
+            return treff, spritecollide(spiller, prosjektiler, False, prosjektil_hash.build(prosjektiler))
+
+        tid_alle, (treff_a, spiller_a) = tid(alle_par)
+        tid_hash, (treff_b, spiller_b) = tid(hash_grid)
+        assert treff_a == treff_b and spiller_a == spiller_b, "broadphase gave different hits"
+        print(f"{antall:>9} {tid_alle:>13.3f} {tid_hash:>16.3f} {tid_alle / tid_hash:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
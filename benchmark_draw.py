@@ -0,0 +1,136 @@
+"""Draw-phase benchmark: per-sprite blits vs the game's layered batch path.
+
+Draws a mixed scene of enemies, shots and explosions at 100, 1,000 and 10,000
+sprites, in two kinds of frame:
+
+- between two ticks, where a third of the sprites moved since the previous tick and
+  are drawn at an interpolated position. The blit loop interpolates every sprite and
+  blits it (the draw path before sprites were batched); batched is GameSession's
+  draw path, which skips interpolation for sprites that did not move
+- on a tick, where every sprite is drawn at its rect: a blit loop, Group.draw() and
+  BatchRenderer.add_group()
+
+Batched paths queue sprites per layer and submit each layer with one
+Surface.blits() call. blits() does the same per-sprite work in C as blit(), so
+batching by itself saves little; at 10,000 sprites every path is bound by the
+pixel fill. Times are the median of RUNDER frames.
+
+    python benchmark_draw.py
+"""
+import os
+import random
+import statistics
+import time
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+from space_invaders_render import LAG_FIENDER, LAG_PROSJEKTILER, LAG_EFFEKTER
+from space_invaders_session import GameSession, load_images, default_config, default_high_scores
+
+ANTALL = (100, 1000, 10000)
+RUNDER = 200
+BREDDE, HOYDE = 800, 600
+ALPHA = 0.5  # Halfway between two ticks
+
+
+class Figur(pygame.sprite.Sprite):
+    def __init__(self, bilde, layer, x, y):
+        super().__init__()
+        self.image = bilde
+        self.layer = layer
+        self.rect = bilde.get_rect(topleft=(x, y))
+
+
+def lag_scene(antall, rng):
+    # Half enemies, a third shots, the rest explosions
+    fiende = pygame.Surface((40, 40), pygame.SRCALPHA)
+    fiende.fill((255, 0, 0, 255))
+    skudd = pygame.Surface((5, 15))
+    skudd.fill((0, 255, 0))
+    eksplosjon = pygame.Surface((30, 30), pygame.SRCALPHA)
+    eksplosjon.fill((255, 165, 0, 160))
+    grupper = {LAG_FIENDER: pygame.sprite.Group(), LAG_PROSJEKTILER: pygame.sprite.Group(),
+               LAG_EFFEKTER: pygame.sprite.Group()}
+    for i in range(antall):
+        if i % 6 < 3:
+            bilde, lag = fiende, LAG_FIENDER
+        elif i % 6 < 5:
+            bilde, lag = skudd, LAG_PROSJEKTILER
+        else:
+            bilde, lag = eksplosjon, LAG_EFFEKTER
+        grupper[lag].add(Figur(bilde, lag, rng.randrange(BREDDE), rng.randrange(HOYDE)))
+    return grupper
+
+
+def forrige_posisjoner(grupper, rng):
+    # Centers at the previous tick: every third sprite moved a few pixels
+    forrige = {}
+    for gruppe in grupper.values():
+        for i, sprite in enumerate(gruppe):
+            x, y = sprite.rect.center
+            forrige[sprite] = (x - rng.randint(1, 4), y + rng.randint(1, 4)) if i % 3 == 0 else (x, y)
+    return forrige
+
+
+def tid(funksjon):
+    tider = []
+    for _ in range(RUNDER):
+        start = time.perf_counter()
+        funksjon()
+        tider.append(time.perf_counter() - start)
+    return statistics.median(tider) * 1000
+
+
+def main():
+    pygame.init()
+    skjerm = pygame.display.set_mode((BREDDE, HOYDE))
+    assets_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+    session = GameSession(load_images(assets_folder), default_config.copy(), default_high_scores.copy(), lagre=False)
+    rng = random.Random(1)
+    scener = []
+    for antall in ANTALL:
+        grupper = lag_scene(antall, rng)
+        scener.append((antall, grupper, pygame.sprite.Group(*grupper.values()), forrige_posisjoner(grupper, rng)))
+
+    print("Between ticks (interpolated)")
+    print(f"{'sprites':>8} {'blit loop ms':>13} {'batched ms':>11} {'vs loop':>8}")
+    for antall, grupper, alle, forrige in scener:
+        def blit_loop():
+            for gruppe in grupper.values():
+                for sprite in gruppe:
+                    skjerm.blit(sprite.image, session._interpolert(sprite, forrige, ALPHA))
+
+        def batched():
+            session._queue_interpolated(alle, forrige, ALPHA)
+            session.batch.flush(skjerm)
+
+        tid_loop = tid(blit_loop)
+        tid_batch = tid(batched)
+        print(f"{antall:>8} {tid_loop:>13.3f} {tid_batch:>11.3f} {tid_loop / tid_batch:>7.2f}x")
+
+    print("On a tick")
+    print(f"{'sprites':>8} {'blit loop ms':>13} {'Group.draw ms':>14} {'batched ms':>11} {'vs loop':>8} {'vs group':>9}")
+    for antall, grupper, alle, forrige in scener:
+        def blit_loop():
+            for gruppe in grupper.values():
+                for sprite in gruppe:
+                    skjerm.blit(sprite.image, sprite.rect)
+
+        def grupper_draw():
+            for gruppe in grupper.values():
+                gruppe.draw(skjerm)
+
+        def batched():
+            session.batch.add_group(alle)
+            session.batch.flush(skjerm)
+
+        tid_loop = tid(blit_loop)
+        tid_gruppe = tid(grupper_draw)
+        tid_batch = tid(batched)
+        print(f"{antall:>8} {tid_loop:>13.3f} {tid_gruppe:>14.3f} {tid_batch:>11.3f} "
+              f"{tid_loop / tid_batch:>7.2f}x {tid_gruppe / tid_batch:>8.2f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,83 +1,149 @@
-import pygame
 import os
-import random
-import math
-
-# Initialize pygame
-pygame.init()
+import sys
+import numpy as np
+import pygame
 
-# Define dimensions for the background
+# Reference size the layout was designed for; other sizes scale from it
 WIDTH = 800
 HEIGHT = 600
 
-# Create the background surface
-background = pygame.Surface((WIDTH, HEIGHT))
-
-# Create a space-themed gradient background (dark blue to black)
-for y in range(HEIGHT):
-    # Calculate color - dark blue gradient to black
-    color_value = max(0, 30 - int(y * 30 / HEIGHT))
-    background.fill((0, 0, color_value), (0, y, WIDTH, 1))
-
-# Add some stars
-for _ in range(200):
-    # Random position
-    x = random.randint(0, WIDTH - 1)
-    y = random.randint(0, HEIGHT - 1)
-    
-    # Random brightness (slightly yellowish white)
-    brightness = random.randint(150, 255)
-    color = (brightness, brightness, random.randint(brightness-50, brightness))
-    
-    # Random size (small stars)
-    size = random.choice([1, 1, 1, 1, 2, 2, 3])
-    
-    # Draw the star
-    pygame.draw.circle(background, color, (x, y), size)
-
-# Add a few larger glows for bigger stars
-for _ in range(20):
-    x = random.randint(0, WIDTH - 1)
-    y = random.randint(0, HEIGHT - 1)
-    radius = random.randint(4, 8)
-    
-    # Create a subtle glow effect
-    for r in range(radius, 0, -1):
-        alpha = max(0, 150 - r * 30)
-        color = (200, 200, 255, alpha)
-        
-        # Create a new surface for the glow
-        glow = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
-        pygame.draw.circle(glow, color, (r, r), r)
-        
-        # Blit the glow onto the background
-        background.blit(glow, (x-r, y-r))
-
-# Add a nebula-like effect in the corner
-for _ in range(500):
-    x = random.randint(0, WIDTH//3)
-    y = random.randint(HEIGHT//2, HEIGHT)
-    
-    # Purple-ish nebula
-    color = (
-        random.randint(30, 80),
-        0,
-        random.randint(50, 120),
-        random.randint(5, 30)
-    )
-    
-    # Create a new surface for each nebula particle
-    particle = pygame.Surface((10, 10), pygame.SRCALPHA)
-    pygame.draw.circle(particle, color, (5, 5), random.randint(3, 8))
-    
-    # Apply the particle to the background
-    background.blit(particle, (x, y))
-
-# Make sure the assets directory exists
-assets_folder = os.path.join(os.path.dirname(__file__), 'assets')
-if not os.path.exists(assets_folder):
-    os.makedirs(assets_folder)
-
-# Save the background
-pygame.image.save(background, os.path.join(assets_folder, 'background.jpg'))
-print(f"Background saved to {os.path.join(assets_folder, 'background.jpg')}")
+
+def _disk(radius):
+    # Pixel offsets covered by a filled circle of this radius
+    r = int(radius)
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    inne = dx * dx + dy * dy <= r * r
+    return dx[inne], dy[inne]
+
+
+def generate_background(size=(WIDTH, HEIGHT), seed=0):
+    """Render the space background at any resolution: blue-to-black gradient, stars,
+    star glows and a purple nebula in the lower left corner.
+
+    Everything is drawn into one RGB array with NumPy; the same seed gives the
+    same picture at every resolution, with star counts scaled to the screen area."""
+    bredde, hoyde = size
+    rng = np.random.default_rng(seed)
+    skala = hoyde / HEIGHT  # Glow and nebula sizes follow the screen height
+    bilde = np.zeros((hoyde, bredde, 3), np.uint8)
+
+    # Gradient: dark blue at the top fading to black
+    y = np.arange(hoyde)
+    bilde[:, :, 2] = np.maximum(0, 30 - (y * 30 // hoyde))[:, None]
+
+    # Stars - slightly yellowish white, mostly 1 pixel radius
+    antall = int(200 * bredde * hoyde / (WIDTH * HEIGHT))
+    sx = rng.integers(0, bredde, antall)
+    sy = rng.integers(0, hoyde, antall)
+    lys = rng.integers(150, 256, antall)
+    farge = np.stack([lys, lys, lys - rng.integers(0, 51, antall)], axis=1)
+    radius = rng.choice([1, 1, 1, 1, 2, 2, 3], antall)
+    for r in (1, 2, 3):
+        valgt = radius == r
+        dx, dy = _disk(r)
+        px = (sx[valgt][:, None] + dx).ravel()
+        py = (sy[valgt][:, None] + dy).ravel()
+        inne = (px >= 0) & (px < bredde) & (py >= 0) & (py < hoyde)
+        bilde[py[inne], px[inne]] = np.repeat(farge[valgt], len(dx), axis=0)[inne]
+
+    # Glows around a few bigger stars: nested rings of pale blue, brighter towards the centre.
+    # Blending the rings one by one leaves each pixel at color + (pixel - color) * keep, where
+    # keep is the product of (1 - alpha) over the rings that cover it - across all glows too,
+    # as they share one color. The positions are drawn one glow at a time to keep the stream.
+    glow_farge = np.array([200, 200, 255], np.float32)
+    antall = int(20 * bredde * hoyde / (WIDTH * HEIGHT))
+    glows = np.array([(rng.integers(0, bredde), rng.integers(0, hoyde), int(rng.integers(4, 9) * skala))
+                      for _ in range(antall)], np.int64).reshape(-1, 3)
+    indekser, logg = [], []
+    for glow_radius in np.unique(glows[:, 2]):
+        valgt = glows[glows[:, 2] == glow_radius]
+        dy, dx = np.mgrid[-glow_radius:glow_radius + 1, -glow_radius:glow_radius + 1]
+        avstand = np.sqrt(dx * dx + dy * dy) / skala
+        keep = np.ones(avstand.shape, np.float32)
+        for r in range(1, 5):  # Rings beyond radius 4 have zero alpha
+            keep *= np.where(avstand <= r, 1 - (150 - r * 30) / 255, 1)
+        dekket = keep < 1
+        dx, dy = dx[dekket], dy[dekket]
+        px = (valgt[:, 0, None] + dx).ravel()
+        py = (valgt[:, 1, None] + dy).ravel()
+        inne = (px >= 0) & (px < bredde) & (py >= 0) & (py < hoyde)
+        indekser.append(py[inne] * bredde + px[inne])
+        logg.append(np.tile(np.log(keep[dekket]), len(valgt))[inne])
+    if indekser:
+        # Multiply per pixel by summing logs with bincount over the covered pixels only
+        dekket, plass = np.unique(np.concatenate(indekser), return_inverse=True)
+        keep = np.exp(np.bincount(plass, np.concatenate(logg)))[:, None]
+        flat = bilde.reshape(-1, 3)
+        flat[dekket] = glow_farge + (flat[dekket] - glow_farge) * keep + 0.5
+
+    # Nebula: many faint purple blobs in the lower left corner. Their coverage is combined
+    # order-independently: total transparency is the product of (1 - alpha), and the color is
+    # the alpha-weighted mean of the blob colors.
+    antall = int(500 * bredde * hoyde / (WIDTH * HEIGHT))
+    nx = rng.integers(0, bredde // 3 + 1, antall)
+    ny = rng.integers(hoyde // 2, hoyde + 1, antall)
+    nfarge = np.stack([rng.integers(30, 81, antall), np.zeros(antall, np.int64), rng.integers(50, 121, antall)],
+                      axis=1).astype(np.float32)
+    nalpha = rng.integers(5, 31, antall) / 255
+    nradius = rng.integers(3, 9, antall)
+    halv = max(1, int(5 * skala))  # Each blob is clipped to a 10x10 box (scaled)
+    # Work only in the part of the screen the nebula can reach. The sums go into a grid padded
+    # by a box on every side so no blob needs clipping, and are cropped to the screen after.
+    ny0, nx1 = hoyde // 2, min(bredde, bredde // 3 + 2 * halv + 1)
+    region = bilde[ny0:, :nx1]
+    rh, rw = region.shape[:2]
+    gw, gh = bredde // 3 + 2 * halv + 1, rh + 2 * halv + 1
+    indekser, blobber = [], []
+    for r in range(3, 9):
+        valgt = np.flatnonzero(nradius == r)
+        dx, dy = _disk(r * skala)
+        boks = (dx >= -halv) & (dx < halv) & (dy >= -halv) & (dy < halv)
+        midt = (ny[valgt] + halv - ny0) * gw + nx[valgt] + halv
+        indekser.append((midt[:, None] + (dy[boks] * gw + dx[boks])).ravel())
+        blobber.append(np.repeat(valgt, np.count_nonzero(boks)))
+    indeks, blob = np.concatenate(indekser), np.concatenate(blobber)
+    # Sum per pixel with bincount over flat pixel indices; the per-blob terms are worked out
+    # once and looked up per covered pixel. Green is always 0, so it is left out.
+    summer = lambda vekter: np.bincount(indeks, vekter[blob], gw * gh).reshape(gh, gw)[:rh, :rw].ravel()
+    vekt = summer(nalpha)
+    dekket = np.flatnonzero(vekt)
+    keep = np.exp(summer(np.log1p(-nalpha))[dekket])[:, None]
+    farge = np.zeros((len(dekket), 3))
+    for k in (0, 2):
+        farge[:, k] = summer(nfarge[:, k] * nalpha)[dekket] / vekt[dekket]
+    flat = region.reshape(-1, 3)  # Copy, as the region is not contiguous
+    flat[dekket] = flat[dekket] * keep + farge * (1 - keep) + 0.5
+    region[:] = flat.reshape(rh, rw, 3)
+
+    return pygame.surfarray.make_surface(bilde.swapaxes(0, 1))
+
+
+# Generated backgrounds, one per (seed, size)
+_bakgrunner = {}
+
+def background(size=(WIDTH, HEIGHT), seed=0):
+    """Cached generated background, converted to the display format when there is one"""
+    nokkel = (seed, tuple(size))
+    bilde = _bakgrunner.get(nokkel)
+    if bilde is None:
+        bilde = generate_background(tuple(size), seed)
+        if pygame.display.get_surface() is not None:
+            bilde = bilde.convert()
+        _bakgrunner[nokkel] = bilde
+    return bilde
+
+
+if __name__ == "__main__":
+    # python create_background.py [seed] [width height]
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    size = (int(sys.argv[2]), int(sys.argv[3])) if len(sys.argv) > 3 else (WIDTH, HEIGHT)
+    pygame.init()
+
+    # Make sure the assets directory exists
+    assets_folder = os.path.join(os.path.dirname(__file__), 'assets')
+    if not os.path.exists(assets_folder):
+        os.makedirs(assets_folder)
+
+    # Save the background
+    pygame.image.save(generate_background(size, seed), os.path.join(assets_folder, 'background.jpg'))
+    print(f"Background saved to {os.path.join(assets_folder, 'background.jpg')}")
@@ -0,0 +1,25 @@
+"""Space Invaders launcher.
+
+    python space_invaders.py                    # play
+    python space_invaders.py --profile-startup  # play, printing how long each startup phase took
+"""
+import argparse
+import time
+
+
+def main(argv=None):
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Space Invaders")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a per-phase timing breakdown of startup")
+    args = parser.parse_args(argv)
+
+    from space_invaders_bootstrap import startup
+    if args.profile_startup:
+        startup.enable(start)
+    import space_invaders_game
+    space_invaders_game.main()
+
+
+if __name__ == "__main__":
+    main()
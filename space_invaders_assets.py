@@ -0,0 +1,287 @@
+"""Pre-baked asset pack.
+
+All images, sounds and the font in assets/ are decoded once into a single pack
+file next to the folder (assets.pack): images as raw RGBA pixels, scaled down to
+the largest size the game draws them at, sounds as PCM in the mixer's format
+and the font as its file bytes. A JSON
+manifest at the start of the pack lists every entry with its offset and the size,
+mtime and SHA-1 of its source file.
+
+At runtime the pack is memory-mapped and each asset is decoded the first time it
+is asked for, so startup reads one file instead of a dozen and skips PNG/JPG/WAV
+decoding. A source file whose size or mtime changed is hashed, and if its hash no
+longer matches the manifest the pack is rebuilt automatically.
+
+    python space_invaders_assets.py    # (re)build the pack
+"""
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import tempfile
+import pygame
+from space_invaders_bootstrap import MIXER_FORMAT
+from space_invaders_cache import rotation_atlas
+from space_invaders_classes import (BREDDE, HOYDE, SPILLER_SIZE, BONUS_SIZE, FIENDE_SKALA, STERK_FIENDE_SKALA,
+                                    NORMAL_IKON_SIZE, STERK_IKON_SIZE)
+
+PAKKE_MAGIC = b'SIPACK1\n'
+PAKKE_VERSJON = 2
+JUSTERING = 64  # Entries start on 64-byte boundaries
+
+# Source files: (entry name, file name, kind)
+KILDER = [
+    ('spiller', 'spiller.png', 'image'),
+    ('spiller2', 'spiller2.png', 'image'),
+    ('spiller3', 'spiller3.png', 'image'),
+    ('spiller4', 'spiller4.png', 'image'),
+    ('fiende', 'fiende.png', 'image'),
+    ('sterk_fiende', 'sterk_fiende.png', 'image'),
+    ('liv', 'liv.png', 'image'),
+    ('background', 'background.jpg', 'image'),
+    ('thock', 'thock.wav', 'sound'),
+    ('eksplosjon', 'eksplosjon.wav', 'sound'),
+    ('theme_song', 'theme_song.wav', 'sound'),
+    ('life', 'life.wav', 'sound'),
+    ('font', 'nasalization-rg.ttf', 'data'),
+]
+
+
+def _storste_fiende(base, lav, hoy):
+    # Largest size bucket an enemy with this base size and scale range is drawn at
+    size = rotation_atlas.size_bucket(int(base * hoy))
+    return (size, size)
+
+
+# Images stored pre-scaled to the largest size they are drawn at; every other size is scaled
+# down from that, so the full-size sources never need to be kept
+FERDIG_SKALERT = {
+    'background': (BREDDE, HOYDE),
+    'spiller': SPILLER_SIZE,
+    'spiller2': SPILLER_SIZE,
+    'spiller3': SPILLER_SIZE,
+    'spiller4': SPILLER_SIZE,
+    'liv': BONUS_SIZE,
+    'fiende': max(_storste_fiende(*FIENDE_SKALA), NORMAL_IKON_SIZE),
+    'sterk_fiende': max(_storste_fiende(*FIENDE_SKALA), _storste_fiende(*STERK_FIENDE_SKALA), STERK_IKON_SIZE),
+}
+
+
+def _sha1(fil):
+    h = hashlib.sha1()
+    with open(fil, 'rb') as f:
+        for blokk in iter(lambda: f.read(1 << 20), b''):
+            h.update(blokk)
+    return h.hexdigest()
+
+
+def _mixer_format():
+    # Format of the running mixer, None if it is not started
+    mixer = pygame.mixer.get_init()
+    return list(mixer) if mixer else None
+
+
+def _start_stille_mixer():
+    # Mixer on SDL's dummy audio driver: decodes sounds in the game's format without opening
+    # an audio device. False if it can't be started either.
+    forrige = os.environ.get('SDL_AUDIODRIVER')
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    try:
+        pygame.mixer.init(**MIXER_FORMAT)
+        return True
+    except pygame.error:
+        return False
+    finally:
+        if forrige is None:
+            del os.environ['SDL_AUDIODRIVER']
+        else:
+            os.environ['SDL_AUDIODRIVER'] = forrige
+
+
+def build_pack(assets_folder, pack_path):
+    """Decode every source asset that exists and write the pack atomically.
+    Sounds are decoded with the running mixer, or with a silent one that is closed again."""
+    stille = pygame.mixer.get_init() is None and _start_stille_mixer()
+    try:
+        _skriv_pakke(assets_folder, pack_path, _mixer_format())
+    finally:
+        if stille:
+            pygame.mixer.quit()
+
+
+def _skriv_pakke(assets_folder, pack_path, mixer):
+    # Without any mixer (not even a silent one) the pack is built without sounds
+    oppforinger = {}
+    kilder = {}
+    blobs = []
+    offset = 0
+    for navn, filnavn, type_ in KILDER:
+        fil = os.path.join(assets_folder, filnavn)
+        if not os.path.exists(fil) or (type_ == 'sound' and mixer is None):
+            continue
+        try:
+            if type_ == 'image':
+                bilde = pygame.image.load(fil)
+                if navn in FERDIG_SKALERT:
+                    bilde = pygame.transform.scale(bilde, FERDIG_SKALERT[navn])
+                data = pygame.image.tobytes(bilde, 'RGBA')
+                info = {'size': list(bilde.get_size())}
+            elif type_ == 'sound':
+                data = pygame.mixer.Sound(fil).get_raw()
+                info = {}
+            else:
+                with open(fil, 'rb') as f:
+                    data = f.read()
+                info = {}
+        except (pygame.error, OSError) as e:
+            print(f"Could not pack {filnavn}: {e}")
+            continue
+        stat = os.stat(fil)
+        kilder[filnavn] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha1': _sha1(fil)}
+        info.update({'type': type_, 'offset': offset, 'length': len(data)})
+        oppforinger[navn] = info
+        fyll = -len(data) % JUSTERING
+        blobs.append(data + b'\0' * fyll)
+        offset += len(data) + fyll
+
+    manifest = json.dumps({'version': PAKKE_VERSJON, 'mixer': mixer,
+                           'sources': kilder, 'entries': oppforinger}).encode()
+    header = PAKKE_MAGIC + struct.pack('<Q', len(manifest)) + manifest
+    header += b'\0' * (-len(header) % JUSTERING)
+
+    mappe = os.path.dirname(os.path.abspath(pack_path))
+    fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=mappe)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp, pack_path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _les_manifest(pack_path):
+    with open(pack_path, 'rb') as f:
+        if f.read(len(PAKKE_MAGIC)) != PAKKE_MAGIC:
+            raise ValueError("not an asset pack")
+        lengde, = struct.unpack('<Q', f.read(8))
+        manifest = json.loads(f.read(lengde))
+    start = len(PAKKE_MAGIC) + 8 + lengde
+    return manifest, start + (-start % JUSTERING)
+
+
+def _er_gyldig(manifest, assets_folder):
+    # The pack is stale if the format or mixer changed, or any source file was added or changed.
+    # Without a running mixer only images and data matter; sounds are checked when played.
+    mixer = _mixer_format()
+    if manifest.get('version') != PAKKE_VERSJON or (mixer is not None and manifest.get('mixer') != mixer):
+        return False
+    kilder = manifest['sources']
+    for _, filnavn, type_ in KILDER:
+        fil = os.path.join(assets_folder, filnavn)
+        kjent = kilder.get(filnavn)
+        if type_ == 'sound' and manifest.get('mixer') is None:
+            continue  # Packed without sounds
+        if not os.path.exists(fil):
+            if kjent is not None:
+                return False
+            continue
+        if kjent is None:
+            return False
+        stat = os.stat(fil)
+        if stat.st_size == kjent['size'] and stat.st_mtime_ns == kjent['mtime']:
+            continue  # Unchanged - skip hashing
+        if _sha1(fil) != kjent['sha1']:
+            return False
+    return True
+
+
+class AssetPack:
+    """Memory-mapped asset pack; each asset is decoded on first use and then cached"""
+
+    def __init__(self, assets_folder, pack_path=None):
+        self.assets_folder = assets_folder
+        self.pack_path = pack_path or os.path.normpath(assets_folder) + '.pack'
+        self.cache = {}
+        self.rebuilt = False
+        self._mmap = None
+        self._open()
+
+    def _open(self):
+        try:
+            manifest, data_start = _les_manifest(self.pack_path)
+            gyldig = _er_gyldig(manifest, self.assets_folder)
+        except (OSError, ValueError, KeyError):
+            gyldig = False
+        if not gyldig:
+            build_pack(self.assets_folder, self.pack_path)
+            manifest, data_start = _les_manifest(self.pack_path)
+            self.rebuilt = True
+        self.entries = manifest['entries']
+        self.mixer = manifest.get('mixer')
+        self.data_start = data_start
+        if self._mmap is not None:
+            self._mmap.close()
+        with open(self.pack_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, navn):
+        return navn in self.entries
+
+    def _bytes(self, navn):
+        if navn not in self.entries:
+            raise FileNotFoundError(f"{navn} is not in the asset pack")
+        info = self.entries[navn]
+        start = self.data_start + info['offset']
+        return memoryview(self._mmap)[start:start + info['length']]
+
+    def image(self, navn):
+        """Surface for an image entry (RGBA, not yet converted to the display format)"""
+        bilde = self.cache.get(navn)
+        if bilde is None:
+            bilde = pygame.image.frombytes(bytes(self._bytes(navn)), tuple(self.entries[navn]['size']), 'RGBA')
+            self.cache[navn] = bilde
+        return bilde
+
+    def sound(self, navn):
+        """New pygame Sound for a sound entry"""
+        mixer = _mixer_format()
+        if mixer is None:
+            raise pygame.error("mixer not initialized")
+        if mixer != self.mixer:
+            self._open()  # Mixer started or changed since the pack was opened - rebuild if stale
+        return pygame.mixer.Sound(buffer=self._bytes(navn))
+
+    def data(self, navn):
+        """Raw bytes for a data entry (e.g. the font file)"""
+        data = self.cache.get(navn)
+        if data is None:
+            data = bytes(self._bytes(navn))
+            self.cache[navn] = data
+        return data
+
+    def font(self, navn, size):
+        return pygame.font.Font(io.BytesIO(self.data(navn)), size)
+
+
+# One pack per assets folder
+_pakker = {}
+
+def asset_pack(assets_folder):
+    pakke = _pakker.get(assets_folder)
+    if pakke is None:
+        pakke = _pakker[assets_folder] = AssetPack(assets_folder)
+    return pakke
+
+
+if __name__ == "__main__":
+    assets_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+    pakke_fil = os.path.normpath(assets_folder) + '.pack'
+    build_pack(assets_folder, pakke_fil)
+    manifest, _ = _les_manifest(pakke_fil)
+    print(f"Packed {len(manifest['entries'])} assets into {pakke_fil} ({os.path.getsize(pakke_fil)} bytes)")
@@ -0,0 +1,69 @@
+import pygame
+
+
+class SpriteAtlas:
+    """All entity images, pre-scaled to the sizes they are drawn at, packed into one surface.
+
+    build() scales each (image, size) pair once and packs the results in rows
+    (tallest first) into a single converted surface. get() hands out subsurfaces
+    of it, so every sprite drawn at a packed size shares the atlas pixels and only
+    holds a small view instead of its own scaled copy."""
+
+    def __init__(self):
+        self.surface = None
+        self.rects = {}    # (source image, size) -> rect in the atlas
+        self.bilder = {}   # (source image, size) -> subsurface
+
+    def clear(self):
+        self.surface = None
+        self.rects.clear()
+        self.bilder.clear()
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __contains__(self, key):
+        return key in self.rects
+
+    def build(self, par, bredde=1024):
+        """Pack every (image, (width, height)) pair into a new atlas"""
+        self.clear()
+        par = list(dict.fromkeys((bilde, (int(size[0]), int(size[1]))) for bilde, size in par))
+        if not par:
+            return self
+        bredde = max(bredde, max(size[0] for _, size in par))
+
+        # Shelf packing: place images left to right, starting a new row when one is full
+        plassering = {}
+        x = y = rad_hoyde = 0
+        for key in sorted(par, key=lambda key: (-key[1][1], -key[1][0])):
+            w, h = key[1]
+            if x + w > bredde:
+                x, y, rad_hoyde = 0, y + rad_hoyde, 0
+            plassering[key] = pygame.Rect(x, y, w, h)
+            x += w
+            rad_hoyde = max(rad_hoyde, h)
+
+        surface = pygame.Surface((bredde, y + rad_hoyde), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        for (bilde, size), rect in plassering.items():
+            surface.blit(pygame.transform.scale(bilde, size), rect)
+
+        self.surface = surface
+        self.rects = plassering
+        self.bilder = {key: surface.subsurface(rect) for key, rect in plassering.items()}
+        return self
+
+    def get(self, bilde, size):
+        """Subsurface for the image at this size, or None if it isn't packed"""
+        return self.bilder.get((bilde, (int(size[0]), int(size[1]))))
+
+    def stats(self):
+        if self.surface is None:
+            return {"images": 0, "size": (0, 0), "fill": 0.0}
+        bredde, hoyde = self.surface.get_size()
+        brukt = sum(rect.width * rect.height for rect in self.rects.values())
+        return {"images": len(self.rects), "size": (bredde, hoyde), "fill": brukt / (bredde * hoyde)}
+
@@ -0,0 +1,59 @@
+import time
+import pygame
+
+# Mixer format every sound in the game is made for
+MIXER_FORMAT = {"frequency": 44100, "size": -16, "channels": 1, "buffer": 1024}
+
+# pygame subsystems are started on first use instead of at import time, so headless
+# tools that only need the simulation never open a window or an audio device.
+
+def init_display():
+    if not pygame.display.get_init():
+        pygame.display.init()
+
+def init_mixer():
+    """Start the mixer in the game's format; False if there is no audio device"""
+    if not pygame.mixer.get_init():
+        try:
+            pygame.mixer.init(**MIXER_FORMAT)
+        except pygame.error as e:
+            print(f"Could not start audio: {e}")
+            return False
+    return True
+
+def init_font():
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+
+class StartupProfiler:
+    """Per-phase timing of game startup, printed with --profile-startup.
+
+    mark(name) records the time since the previous mark (or since the profiler was
+    created) as one phase; report() prints the phases when enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.start = self.forrige = time.perf_counter()
+        self.faser = []
+
+    def enable(self, start=None):
+        self.enabled = True
+        if start is not None:
+            self.start = self.forrige = start
+
+    def mark(self, navn):
+        naa = time.perf_counter()
+        self.faser.append((navn, naa - self.forrige))
+        self.forrige = naa
+
+    def report(self):
+        if not self.enabled:
+            return
+        print("Startup:")
+        for navn, sekunder in self.faser:
+            print(f"  {navn:<24} {sekunder * 1000:8.1f} ms")
+        print(f"  {'total':<24} {(self.forrige - self.start) * 1000:8.1f} ms")
+
+
+startup = StartupProfiler()
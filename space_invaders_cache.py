@@ -0,0 +1,115 @@
+import pygame
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded cache that evicts the least recently used entry, with hit/miss counters"""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, lag):
+        """Return the cached value for key, building it with lag() on a miss"""
+        verdi = self.entries.get(key)
+        if verdi is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return verdi
+        self.misses += 1
+        verdi = lag()
+        self.entries[key] = verdi
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return verdi
+
+    def clear(self):
+        self.entries.clear()
+
+    def hit_rate(self):
+        oppslag = self.hits + self.misses
+        return self.hits / oppslag if oppslag else 0.0
+
+    def stats(self):
+        return {"entries": len(self.entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate()}
+
+
+class RotationAtlas:
+    """Process-wide cache of scaled and rotated sprite frames.
+
+    Frames are keyed by (source image, size bucket, angle bucket), so every enemy
+    with the same pose shares one surface and each pose is rotated only once."""
+    SIZE_STEP = 4    # Pixels between size buckets
+    ANGLE_STEP = 3   # Degrees between rotation frames
+
+    def __init__(self, max_frames=1024):
+        self.frames = LRUCache(max_frames)
+        self.bases = LRUCache(64)
+
+    def size_bucket(self, size):
+        return max(self.SIZE_STEP, int(round(size / self.SIZE_STEP)) * self.SIZE_STEP)
+
+    def base(self, kilde, size, atlas=None):
+        """Source image scaled to a size bucket (unrotated), from the given sprite atlas if packed there"""
+        size = self.size_bucket(size)
+        pakket = atlas.get(kilde, (size, size)) if atlas is not None else None
+        if pakket is not None:
+            return pakket
+        return self.bases.get((kilde, size), lambda: pygame.transform.scale(kilde, (size, size)))
+
+    def frame(self, kilde, size, angle, atlas=None):
+        """Source image scaled to a size bucket and rotated to the nearest angle bucket"""
+        size = self.size_bucket(size)
+        steg = int(round(angle / self.ANGLE_STEP)) % (360 // self.ANGLE_STEP)
+        if steg == 0:
+            return self.base(kilde, size, atlas)  # Unrotated - no need for a rotated copy
+        return self.frames.get((kilde, size, steg),
+                               lambda: pygame.transform.rotate(self.base(kilde, size, atlas), steg * self.ANGLE_STEP))
+
+    def stats(self):
+        return self.frames.stats()
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, text, antialias, color, background).
+
+    Menus and the HUD render mostly the same strings every frame; this renders each
+    one once. The returned surfaces are shared, so callers must not draw on them."""
+    def __init__(self, max_entries=512):
+        self.surfaces = LRUCache(max_entries)
+
+    def render(self, font, text, antialias, color, background=None):
+        color = tuple(color)
+        if background is not None:
+            background = tuple(background)
+        key = (font, text, antialias, color, background)
+        return self.surfaces.get(key, lambda: font.render(text, antialias, color, background))
+
+    def stats(self):
+        return self.surfaces.stats()
+
+
+class ScaledAssetCache:
+    """Scaled copies of the game's images, keyed by (source image, target size).
+
+    Sizes packed into the sprite atlas come from there; any other pair is scaled
+    once on first use, so per-frame code only does lookups."""
+    def __init__(self, max_entries=128):
+        self.images = LRUCache(max_entries)
+
+    def scaled(self, bilde, size, atlas=None):
+        size = (int(size[0]), int(size[1]))
+        pakket = atlas.get(bilde, size) if atlas is not None else None
+        if pakket is not None:
+            return pakket
+        return self.images.get((bilde, size), lambda: pygame.transform.scale(bilde, size))
+
+    def stats(self):
+        return self.images.stats()
+
+
+rotation_atlas = RotationAtlas()
+text_cache = TextCache()
+scaled_assets = ScaledAssetCache()
@@ -1,17 +1,15 @@
 import pygame
 import random
 import math
+import numpy as np
 import os
-import json
 import sys
-
-# Initialize pygame if not already initialized
-if not pygame.get_init():
-    pygame.init()
-    
-# Initialize mixer if not already initialized
-if not pygame.mixer.get_init():
-    pygame.mixer.init(frequency=44100, size=-16, channels=1, buffer=1024)
+from space_invaders_atlas import SpriteAtlas
+from space_invaders_cache import LRUCache, rotation_atlas, text_cache, scaled_assets
+from space_invaders_collision import SpatialHash
+from space_invaders_storage import JsonStore
+from space_invaders_sound import lag_lyd
+from space_invaders_render import LAG_FIENDER, LAG_PROSJEKTILER, LAG_EFFEKTER, LAG_HUD
 
 # Screen dimensions
 BREDDE = 800
@@ -25,6 +23,29 @@ GRONN = (0, 255, 255)
 BLA = (0, 123, 255)
 GUL = (255, 165, 0)
 
+# Pastel colors for game modes (shared by the menu, help screen and in-game HUD)
+pastel_colors = {
+    "easy": (180, 230, 220),    # Soft mint
+    "medium": (230, 220, 180),  # Soft yellow
+    "hard": (230, 180, 180),    # Soft pink
+    "impossible": (180, 180, 230), # Soft blue
+    "level": (210, 180, 230)    # Soft purple
+}
+
+# Fixed-timestep simulation: speeds in this module are given per frame at the original
+# 60 FPS and scaled by the session's tikk_skala (see SpillKontekst), so changing the
+# tick rate does not change game speed
+STANDARD_TICK_RATE = 60
+
+# Move a sprite by a per-frame speed, carrying the sub-pixel remainder between ticks
+def flytt(sprite, dx, dy):
+    skala = sprite.kontekst.tikk_skala
+    fx = dx * skala + sprite.rest_x
+    fy = dy * skala + sprite.rest_y
+    steg_x, steg_y = int(fx), int(fy)
+    sprite.rest_x, sprite.rest_y = fx - steg_x, fy - steg_y
+    sprite.rect.move_ip(steg_x, steg_y)
+
 # Game states
 class Spilltilstand:
     MENY = 0
@@ -48,7 +69,14 @@ default_config = {
     "sound_volume": 0.5,
     "music_volume": 0.07,
     "fullscreen_enabled": False,
-    "mouse_control": False  # New default setting for mouse control
+    "mouse_control": False,  # New default setting for mouse control
+    "tick_rate": 60,  # Game logic updates per second
+    "max_fps": 60,  # Render rate cap (0 = uncapped)
+    "projectile_pool_cap": 256,  # Max idle projectiles kept for reuse per projectile type
+    "star_count": 100,  # Background stars
+    "star_layers": 3,  # Parallax layers the stars are spread over
+    "dirty_rendering": False,  # Only push changed screen regions to the display (toggle with F2)
+    "record_replays": True  # Record each game to last_replay.sirp for playback with space_invaders_replay.py
 }
 
 # Default high scores
@@ -60,105 +88,67 @@ default_high_scores = {
     "level_mode": {}  # For level-specific high scores
 }
 
-# Load configuration
+# In-memory config and high scores, written to disk in the background
+config_store = JsonStore(CONFIG_FILE, default_config)
+high_score_store = JsonStore(HIGH_SCORE_FILE, default_high_scores)
+
+# Load configuration (read from disk once, then shared)
 def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return default_config.copy()
-    else:
-        # Create default configuration if file doesn't exist
-        save_config(default_config)
-        return default_config.copy()
+    return config_store.load()
 
-# Load high scores
+# Load high scores (read from disk once, then shared)
 def load_high_scores():
-    if os.path.exists(HIGH_SCORE_FILE):
-        try:
-            with open(HIGH_SCORE_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return default_high_scores.copy()
-    else:
-        # Create default high scores if file doesn't exist
-        save_high_scores(default_high_scores)
-        return default_high_scores.copy()
+    return high_score_store.load()
 
-# Save configuration
+# Save configuration - the file is written shortly after, off the main thread
 def save_config(config):
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=4)
+    config_store.save(config)
 
-# Save high scores
+# Save high scores - the file is written shortly after, off the main thread
 def save_high_scores(scores):
-    with open(HIGH_SCORE_FILE, 'w') as f:
-        json.dump(scores, f, indent=4)
-
-# Functions to generate sounds if files don't exist
-def lag_eksplosjon_lyd():
-    buffer = bytearray()
-    # Low frequency sound with noise
-    for i in range(12000):
-        amplitude = max(0, 1 - i/10000)
-        verdi = int(127 + amplitude * 127 * random.uniform(-1, 1))
-        buffer.append(verdi)
-    return pygame.mixer.Sound(buffer)
-
-def lag_bonus_lyd():
-    buffer = bytearray()
+    high_score_store.save(scores)
+
+# Write any pending saves now (on quit)
+def flush_storage():
+    config_store.flush()
+    high_score_store.flush()
+
+# Functions to generate sounds if files don't exist (synthesized in space_invaders_sound)
+def lag_eksplosjon_lyd(**params):
+    # Noise burst that fades out
+    return lag_lyd('eksplosjon', **params)
+
+def lag_bonus_lyd(**params):
     # Ascending tone
-    for i in range(8000):
-        frekvens = 300 + i/20
-        verdi = int(127 + 127 * 0.8 * math.sin(frekvens * i/1000))
-        buffer.append(verdi)
-    return pygame.mixer.Sound(buffer)
-
-def lag_skyte_lyd():
-    buffer = bytearray()
+    return lag_lyd('bonus', **params)
+
+def lag_skyte_lyd(**params):
     # Sound that sounds like "thock"
-    for i in range(4000):
-        verdi = int(127 + 127 * max(0, 1 - i/1000) * (0.8 if i % 8 < 4 else -0.8))
-        buffer.append(verdi)
-    return pygame.mixer.Sound(buffer)
-
-# Star class for background effect
-class Star(pygame.sprite.Sprite):
-    def __init__(self):
-        super().__init__()
-        # Different sizes for stars to simulate depth
-        size = random.randint(1, 3)
-        self.image = pygame.Surface((size, size))
-        self.image.fill(HVIT)
-        self.rect = self.image.get_rect()
-        
-        # Random position
-        self.rect.x = random.randrange(BREDDE)
-        self.rect.y = random.randrange(HOYDE)
-        
-        # Different speeds for parallax effect
-        self.speed = random.uniform(1, 5)
-        
-    def update(self):
-        # Move stars down to create illusion of forward movement
-        self.rect.y += self.speed
-        
-        # Reset position if star goes off screen
-        if self.rect.top > HOYDE:
-            self.rect.y = -self.rect.height
-            self.rect.x = random.randrange(BREDDE)
+    return lag_lyd('skyte', **params)
+
+# Sizes the images are drawn at
+SPILLER_SIZE = (50, 40)
+BONUS_SIZE = (30, 30)
+NORMAL_IKON_SIZE = (25, 25)  # Enemy icons in the HUD point display
+STERK_IKON_SIZE = (30, 30)
+# Enemy base size in pixels and the range it is randomly scaled by
+FIENDE_SKALA = (40, 0.7, 1.2)
+STERK_FIENDE_SKALA = (50, 0.8, 1.3)
 
 # Player class
 class Spiller(pygame.sprite.Sprite):
-    def __init__(self, spiller_bilde):
+    layer = LAG_FIENDER  # Draw-order layer
+
+    def __init__(self, kontekst, spiller_bilde):
         super().__init__()
+        self.kontekst = kontekst
         self.base_bilde = spiller_bilde
-        self.image = pygame.transform.scale(self.base_bilde, (50, 40))
+        self.image = scaled_assets.scaled(self.base_bilde, SPILLER_SIZE, kontekst.atlas)
         self.rect = self.image.get_rect()
         self.rect.centerx = BREDDE // 2
         self.rect.bottom = HOYDE - 10
         self.hastighet = 8
+        self.rest_x = self.rest_y = 0.0
         self.liv = 3
         # Add variables for shot cooldown
         self.siste_skudd = 0
@@ -174,30 +164,38 @@ class Spiller(pygame.sprite.Sprite):
         self.target_x = self.rect.centerx  # Target position for smooth mouse movement
         self.mouse_speed_factor = 0.5  # More moderate speed factor for smoother tracking
         
-    def update(self, poeng, spiller_bilder, mouse_control=False):
+    def update(self, poeng, spiller_bilder, mouse_control=False, inputs=None):
+        # Read the input state for this tick - either handed in by a GameSession
+        # (headless/replay) or polled straight from pygame
+        if inputs is not None:
+            venstre, hoyre, mouse_x = inputs.left, inputs.right, inputs.mouse_x
+        else:
+            taster = pygame.key.get_pressed()
+            venstre = taster[pygame.K_LEFT] or taster[pygame.K_a]
+            hoyre = taster[pygame.K_RIGHT] or taster[pygame.K_d]
+            mouse_x = pygame.mouse.get_pos()[0] if mouse_control else None
+        
         # Handle keyboard controls when mouse control is disabled
         if not mouse_control:
-            taster = pygame.key.get_pressed()
             # Move left with either left arrow or A
-            if taster[pygame.K_LEFT] or taster[pygame.K_a]:
-                self.rect.x -= self.hastighet
+            if venstre:
+                flytt(self, -self.hastighet, 0)
                 # Pac-Man-like wrap-around when player goes off left edge
                 if self.rect.right < 0:
                     self.rect.left = BREDDE
             # Move right with either right arrow or D
-            if taster[pygame.K_RIGHT] or taster[pygame.K_d]:
-                self.rect.x += self.hastighet
+            if hoyre:
+                flytt(self, self.hastighet, 0)
                 # Pac-Man-like wrap-around when player goes off right edge
                 if self.rect.left > BREDDE:
                     self.rect.right = 0
         else:
             # Mouse control - more direct but still smooth tracking with bounded movement
-            mouse_x, _ = pygame.mouse.get_pos()
-            
-            # Set target position to mouse x-coordinate
+            # Set target position to mouse x-coordinate (keep the old target if no mouse position is known)
             # Ensure the target is within valid bounds for the rocket (half width from each edge)
             half_width = self.rect.width // 2
-            self.target_x = max(half_width, min(mouse_x, BREDDE - half_width))
+            if mouse_x is not None:
+                self.target_x = max(half_width, min(mouse_x, BREDDE - half_width))
             
             # Calculate distance to move (the error between current and target position)
             dx = self.target_x - self.rect.centerx
@@ -214,12 +212,13 @@ class Spiller(pygame.sprite.Sprite):
                 # Ensure we move at least 1 pixel if we're moving at all
                 if move_amount < 1:
                     move_amount = 1
-                    
-                # Apply direction
-                if dx > 0:
-                    self.rect.x += move_amount
-                else:
-                    self.rect.x -= move_amount
+                
+                # Scale to the tick length, but never past the target - at low tick
+                # rates a full step would overshoot the cursor and oscillate around it
+                steg = min(abs(dx), move_amount * self.kontekst.tikk_skala)
+                fx = (steg if dx > 0 else -steg) + self.rest_x
+                self.rest_x = fx - int(fx)
+                self.rect.move_ip(int(fx), 0)
             
             # Ensure rocket stays on screen by clamping position
             # This is a safeguard in case other logic fails
@@ -238,21 +237,25 @@ class Spiller(pygame.sprite.Sprite):
         spiller_bilde, spiller2_bilde, spiller3_bilde, spiller4_bilde = spiller_bilder
         
         if poeng >= 1500:
-            self.base_bilde = spiller4_bilde
+            nytt_bilde = spiller4_bilde
         elif poeng >= 1000:
-            self.base_bilde = spiller3_bilde
+            nytt_bilde = spiller3_bilde
         elif poeng >= 500:
-            self.base_bilde = spiller2_bilde
+            nytt_bilde = spiller2_bilde
         else:
-            self.base_bilde = spiller_bilde
+            nytt_bilde = spiller_bilde
         
-        # Update the image but keep the size
-        self.image = pygame.transform.scale(self.base_bilde, (50, 40))
+        # Only swap the image when the skin tier actually changes
+        if nytt_bilde is not self.base_bilde:
+            self.base_bilde = nytt_bilde
+            self.image = scaled_assets.scaled(self.base_bilde, SPILLER_SIZE, self.kontekst.atlas)
         
         return False
 
-    def skyt(self, alle_sprites, skudd_gruppe, aktive_skudd, skyte_lyd, VANSKELIGHETSGRAD, fiende_gruppe=None, weapon_override=None):
-        naa = pygame.time.get_ticks()
+    def skyt(self, alle_sprites, skudd_gruppe, aktive_skudd, skyte_lyd, VANSKELIGHETSGRAD, fiende_gruppe=None, weapon_override=None, naa=None):
+        # Use the caller's simulation clock if given, otherwise wall-clock time
+        if naa is None:
+            naa = pygame.time.get_ticks()
         
         # Use specified weapon if override is provided
         current_weapon = weapon_override if weapon_override is not None else self.current_weapon
@@ -261,7 +264,7 @@ class Spiller(pygame.sprite.Sprite):
         if current_weapon == 'electric whip':
             if self.whip_charge >= self.whip_charge_threshold and fiende_gruppe:
                 # Create whip animation
-                whip = ElectricWhip(self.rect.midtop, BREDDE, HOYDE)
+                whip = ElectricWhip(self.kontekst, self.rect.midtop, BREDDE, HOYDE)
                 alle_sprites.add(whip)
                 
                 # Play whip sound
@@ -277,7 +280,7 @@ class Spiller(pygame.sprite.Sprite):
             if current_weapon == 'shotgun':
                 # Fire 7 pellets with wider angles
                 for angle in [-45, -30, -15, 0, 15, 30, 45]:
-                    skudd = ShotgunShot(self.rect.centerx, self.rect.top, angle)
+                    skudd = self.kontekst.shotgun_pool.acquire(self.rect.centerx, self.rect.top, angle)
                     skudd.hastighet = -20 if VANSKELIGHETSGRAD == 1 else -8
                     alle_sprites.add(skudd)
                     skudd_gruppe.add(skudd)
@@ -285,7 +288,7 @@ class Spiller(pygame.sprite.Sprite):
                         aktive_skudd.append(skudd)
             else:
                 # Normal single shot
-                skudd = Skudd(self.rect.centerx, self.rect.top)
+                skudd = self.kontekst.skudd_pool.acquire(self.rect.centerx, self.rect.top)
                 skudd.hastighet = -30 if VANSKELIGHETSGRAD == 1 else -10
                 alle_sprites.add(skudd)
                 skudd_gruppe.add(skudd)
@@ -305,20 +308,85 @@ class Spiller(pygame.sprite.Sprite):
             return True
         return False
 
+# One shared image per projectile type (size, color)
+_prosjektil_bilder = {}
+
+def prosjektil_bilde(size, farge):
+    bilde = _prosjektil_bilder.get((size, farge))
+    if bilde is None:
+        bilde = pygame.Surface(size)
+        bilde.fill(farge)
+        _prosjektil_bilder[(size, farge)] = bilde
+    return bilde
+
+# Object pool for projectiles - killed projectiles are kept and reused instead of
+# being garbage collected, so sustained fire doesn't allocate new sprites
+class ProjectilePool:
+    def __init__(self, kontekst, klasse, cap=256):
+        self.kontekst = kontekst  # Projectiles are created for this session's context
+        self.klasse = klasse
+        self.cap = cap  # Max number of idle projectiles kept for reuse
+        self.ledige = []
+        self.hits = 0  # Projectiles handed out from the pool
+        self.misses = 0  # Projectiles that had to be allocated
+
+    def acquire(self, *args):
+        if self.ledige:
+            prosjektil = self.ledige.pop()
+            prosjektil.reset(*args)
+            self.hits += 1
+        else:
+            prosjektil = self.klasse(self.kontekst, *args)
+            prosjektil.pool = self
+            self.misses += 1
+        prosjektil.i_pool = False
+        return prosjektil
+
+    def release(self, prosjektil):
+        if not prosjektil.i_pool and len(self.ledige) < self.cap:
+            prosjektil.i_pool = True
+            self.ledige.append(prosjektil)
+
+    def preallocate(self, antall, *args):
+        while len(self.ledige) < min(antall, self.cap):
+            prosjektil = self.klasse(self.kontekst, *args)
+            prosjektil.pool = self
+            prosjektil.i_pool = True
+            self.ledige.append(prosjektil)
+
+    def stats(self):
+        return {"idle": len(self.ledige), "cap": self.cap, "hits": self.hits, "misses": self.misses}
+
 # Shot class
 class Skudd(pygame.sprite.Sprite):
-    def __init__(self, x, y):
+    layer = LAG_PROSJEKTILER  # Draw-order layer
+    size = (5, 15)
+    farge = GRONN
+    pool = None  # Set when the shot is owned by a ProjectilePool
+    i_pool = False
+
+    def __init__(self, kontekst, x, y):
         super().__init__()
-        self.image = pygame.Surface((5, 15))
-        self.image.fill(GRONN)
+        self.kontekst = kontekst
+        self.image = prosjektil_bilde(self.size, self.farge)
         self.rect = self.image.get_rect()
+        Skudd.reset(self, x, y)
+
+    def reset(self, x, y):
         self.rect.centerx = x
         self.rect.bottom = y
         self.hastighet = -10
+        self.rest_x = self.rest_y = 0.0
         self.truffet_fiende = False  # For multiplier tracking
 
+    def kill(self):
+        super().kill()
+        # Hand the shot back to its pool for reuse
+        if self.pool is not None:
+            self.pool.release(self)
+
     def update(self, reset_multiplier_func=None):
-        self.rect.y += self.hastighet
+        flytt(self, 0, self.hastighet)
         # Remove shot if it goes off screen
         if self.rect.bottom < 0:
             # Only reset multiplier for non-shotgun shots
@@ -328,61 +396,48 @@ class Skudd(pygame.sprite.Sprite):
 
 # ExplosiveShot class that inherits from Skudd
 class ExplosiveShot(Skudd):
-    def __init__(self, x, y):
-        super().__init__(x, y)
-        self.image.fill(ROD)  # Red color instead of green
-        self.image = pygame.Surface((7, 18))  # Slightly larger
-        self.image.fill((255, 100, 100))  # Reddish color
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.bottom = y
+    size = (7, 18)  # Slightly larger
+    farge = (255, 100, 100)  # Reddish color
+
+    def __init__(self, kontekst, x, y):
+        super().__init__(kontekst, x, y)
         self.explosion_radius = 80  # Radius of explosion effect
     
-    def explode(self, alle_sprites, fiende_gruppe, poeng, score_multiplier, eksplosjon_lyd):
+    def explode(self, alle_sprites, fiende_gruppe, poeng, score_multiplier, eksplosjon_lyd, naa=None, spatial_hash=None):
+        """Damage every enemy within explosion_radius.
+        Returns the points earned and a list with the type name of each killed enemy,
+        so the caller can respawn them. spatial_hash may be a grid already built for fiende_gruppe."""
         # Create explosion effect at current position
-        explosion = ExplosiveEffect(self.rect.center, self.explosion_radius)
+        explosion = ExplosiveEffect(self.rect.center, self.explosion_radius, naa)
         alle_sprites.add(explosion)
         
         # Play explosion sound
         eksplosjon_lyd.play(maxtime=0, fade_ms=0)
         
-        # Track how many points were earned for return value
+        if spatial_hash is None:
+            spatial_hash = SpatialHash().build(fiende_gruppe)
+
         total_points_earned = 0
+        drept = []
         
-        # Damage all enemies within explosion radius
-        for fiende in fiende_gruppe:
-            # Calculate distance between explosion center and enemy center
-            distance = math.sqrt(
-                (fiende.rect.centerx - self.rect.centerx) ** 2 +
-                (fiende.rect.centery - self.rect.centery) ** 2
-            )
-            
-            # If enemy is within radius, damage it
-            if distance <= self.explosion_radius:
-                # Kill regular enemies immediately, damage strong enemies
-                if isinstance(fiende, SterkFiende):
-                    fiende.treff += 1
-                    if fiende.treff >= fiende.max_treff:
-                        # Calculate points based on multiplier
-                        point_gain = int(fiende.point_value * score_multiplier)
-                        total_points_earned += point_gain
-                        fiende.kill()
-                        
-                        # Return enemy type for respawning in main script
-                        return total_points_earned, "SterkFiende"
-                else:
-                    # Regular enemy - kill immediately
-                    point_gain = int(fiende.point_value * score_multiplier)
-                    total_points_earned += point_gain
-                    fiende.kill()
-                    
-                    # Return enemy type for respawning in main script
-                    return total_points_earned, "Fiende"
+        # One radius query finds every enemy in the blast
+        for fiende in spatial_hash.query_radius(self.rect.center, self.explosion_radius):
+            # Enemies killed earlier this tick may still be in the grid
+            if fiende not in fiende_gruppe:
+                continue
+            # Kill regular enemies immediately, damage strong enemies
+            if isinstance(fiende, SterkFiende):
+                fiende.treff += 1
+                if fiende.treff < fiende.max_treff:
+                    continue
+            total_points_earned += int(fiende.point_value * score_multiplier)
+            drept.append(type(fiende).__name__)
+            fiende.kill()
         
-        return total_points_earned, None
+        return total_points_earned, drept
     
     def update(self, reset_multiplier_func=None):
-        self.rect.y += self.hastighet
+        flytt(self, 0, self.hastighet)
         # When reaching top of screen or if killed by collision, explode
         if self.rect.bottom < 0:
             # Signal to main script that explosion should occur
@@ -393,14 +448,15 @@ class ExplosiveShot(Skudd):
 
 # ShotgunShot class that inherits from Skudd
 class ShotgunShot(Skudd):
-    def __init__(self, x, y, angle=0):
-        super().__init__(x, y)
-        self.image.fill((255, 100, 0))  # Orange color for shotgun pellets
-        self.image = pygame.Surface((4, 10))  # Smaller than normal shot
-        self.image.fill((255, 165, 0))  # Orange color
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.bottom = y
+    size = (4, 10)  # Smaller than normal shot
+    farge = (255, 165, 0)  # Orange color for shotgun pellets
+
+    def __init__(self, kontekst, x, y, angle=0):
+        super().__init__(kontekst, x, y)
+        self.reset(x, y, angle)
+
+    def reset(self, x, y, angle=0):
+        super().reset(x, y)
         self.angle = math.radians(angle)  # Convert angle to radians
         self.range = 200   # Extended range from 150 to 200
         self.distance_traveled = 0
@@ -408,11 +464,10 @@ class ShotgunShot(Skudd):
         
     def update(self, reset_multiplier_func=None):
         # Update position with both vertical and horizontal components
-        self.rect.y += self.hastighet
-        self.rect.x += self.horizontal_speed
+        flytt(self, self.horizontal_speed, self.hastighet)
         
         # Track distance traveled
-        self.distance_traveled += abs(self.hastighet)
+        self.distance_traveled += abs(self.hastighet) * self.kontekst.tikk_skala
         
         # Remove shot if it goes off screen or exceeds range
         if self.rect.bottom < 0 or self.rect.left > BREDDE or self.rect.right < 0 or self.distance_traveled > self.range:
@@ -421,68 +476,93 @@ class ShotgunShot(Skudd):
                 reset_multiplier_func()
             self.kill()
 
+# Shared animation frames for the explosion effects, keyed by (effect, size).
+# Frames are built on first use and indexed by frame number, so explosions
+# allocate no surfaces of their own.
+_effekt_frames = {}
+
+def explosive_effect_frames(radius, max_frames=10):
+    frames = _effekt_frames.get(("explosive", radius, max_frames))
+    if frames is None:
+        frames = []
+        for frame in range(max_frames):
+            bilde = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+            
+            # Calculate the current explosion size
+            progress = frame / max_frames
+            current_radius = int(radius * (1 - progress/2))  # Shrink slightly over time
+            
+            # Draw an expanding/contracting circular explosion
+            if frame < max_frames // 2:
+                # Expanding phase - red to orange
+                color_r = min(255, 180 + frame * 15)
+                color_g = min(255, frame * 25)
+                color_b = 0
+                alpha = 200
+            else:
+                # Contracting phase - orange to yellow to transparent
+                color_r = 255
+                color_g = min(255, 100 + frame * 15)
+                color_b = min(255, (frame - max_frames//2) * 40)
+                alpha = max(0, 200 - (frame - max_frames//2) * 40)
+            
+            # Draw with glow effect (multiple circles with decreasing opacity)
+            for i in range(3):
+                r_offset = current_radius - i * 10
+                if r_offset > 0:
+                    pygame.draw.circle(bilde, (color_r, color_g, color_b, alpha//(i+1)), (radius, radius), r_offset)
+            frames.append(bilde)
+        _effekt_frames[("explosive", radius, max_frames)] = frames
+    return frames
+
+def eksplosjon_frames():
+    frames = _effekt_frames.get(("eksplosjon", 50))
+    if frames is None:
+        frames = []
+        # Orange circle shrinking by 8 pixels per frame
+        for frame in range(6):
+            size = 50 - frame * 8
+            bilde = pygame.Surface((size, size))
+            pygame.draw.circle(bilde, (255, 165, 0), (int(size/2), int(size/2)), int(size/2))
+            bilde.set_colorkey(SVART)
+            frames.append(bilde)
+        _effekt_frames[("eksplosjon", 50)] = frames
+    return frames
+
 # Explosive effect animation
 class ExplosiveEffect(pygame.sprite.Sprite):
-    def __init__(self, center, radius):
+    layer = LAG_EFFEKTER  # Draw-order layer
+
+    def __init__(self, center, radius, naa=None):
         super().__init__()
         self.radius = radius
         self.center = center
-        self.image = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
-        self.rect = self.image.get_rect()
-        self.rect.center = center
         self.frame = 0
         self.max_frames = 10
-        self.last_update = pygame.time.get_ticks()
+        self.frames = explosive_effect_frames(radius, self.max_frames)
+        self.image = self.frames[0]
+        self.rect = self.image.get_rect()
+        self.rect.center = center
+        self.last_update = pygame.time.get_ticks() if naa is None else naa
         self.frame_rate = 40  # Milliseconds between frames
-        self.draw_frame()
-        
-    def draw_frame(self):
-        # Clear the image
-        self.image.fill((0, 0, 0, 0))
-        
-        # Calculate the current explosion size
-        progress = self.frame / self.max_frames
-        current_radius = int(self.radius * (1 - progress/2))  # Shrink slightly over time
-        
-        # Draw an expanding/contracting circular explosion
-        if self.frame < self.max_frames // 2:
-            # Expanding phase - red to orange
-            color_r = min(255, 180 + self.frame * 15)
-            color_g = min(255, self.frame * 25)
-            color_b = 0
-            alpha = 200
-        else:
-            # Contracting phase - orange to yellow to transparent
-            color_r = min(255, 255)
-            color_g = min(255, 100 + self.frame * 15)
-            color_b = min(255, (self.frame - self.max_frames//2) * 40)
-            alpha = max(0, 200 - (self.frame - self.max_frames//2) * 40)
-        
-        # Draw with glow effect (multiple circles with decreasing opacity)
-        for i in range(3):
-            r_offset = current_radius - i * 10
-            if r_offset > 0:
-                pygame.draw.circle(
-                    self.image, 
-                    (color_r, color_g, color_b, alpha//(i+1)), 
-                    (self.radius, self.radius), 
-                    r_offset
-                )
     
-    def update(self):
-        now = pygame.time.get_ticks()
+    def update(self, naa=None):
+        now = pygame.time.get_ticks() if naa is None else naa
         if now - self.last_update > self.frame_rate:
             self.last_update = now
             self.frame += 1
             if self.frame >= self.max_frames:
                 self.kill()
             else:
-                self.draw_frame()
+                self.image = self.frames[self.frame]
 
 # Notification class for weapon upgrade
 class WeaponUpgradeNotification(pygame.sprite.Sprite):
-    def __init__(self, game_font_medium, game_font_small):
+    layer = LAG_HUD  # Draw-order layer
+
+    def __init__(self, kontekst, game_font_medium, game_font_small):
         super().__init__()
+        self.kontekst = kontekst
         self.image = pygame.Surface((500, 60), pygame.SRCALPHA)
         self.rect = self.image.get_rect(center=(BREDDE//2, HOYDE//2 - 50))
         self.timer = 180  # Show for 3 seconds (60 fps * 3)
@@ -494,22 +574,25 @@ class WeaponUpgradeNotification(pygame.sprite.Sprite):
         pygame.draw.rect(self.image, (255, 0, 0), (0, 0, 500, 60), 2)
         
         # Get text with game_font_medium
-        title_text = game_font_medium.render("VÅPEN OPPGRADERT!", True, (255, 50, 50))
-        desc_text = game_font_small.render("Du har låst opp eksplosivt laser (1200+ poeng)", True, HVIT)
+        title_text = text_cache.render(game_font_medium, "VÅPEN OPPGRADERT!", True, (255, 50, 50))
+        desc_text = text_cache.render(game_font_small, "Du har låst opp eksplosivt laser (1200+ poeng)", True, HVIT)
         
         # Center the text
         self.image.blit(title_text, (250 - title_text.get_width()//2, 5))
         self.image.blit(desc_text, (250 - desc_text.get_width()//2, 35))
     
     def update(self):
-        self.timer -= 1
+        self.timer -= self.kontekst.tikk_skala
         if self.timer <= 0:
             self.kill()
 
 # Notification class for weapon unlock
 class WeaponUnlockNotification(pygame.sprite.Sprite):
-    def __init__(self, game_font_medium, game_font_small):
+    layer = LAG_HUD  # Draw-order layer
+
+    def __init__(self, kontekst, game_font_medium, game_font_small):
         super().__init__()
+        self.kontekst = kontekst
         self.image = pygame.Surface((500, 80), pygame.SRCALPHA)
         self.rect = self.image.get_rect(center=(BREDDE//2, HOYDE//2 - 50))
         self.timer = 180  # Show for 3 seconds (60 fps * 3)
@@ -521,9 +604,9 @@ class WeaponUnlockNotification(pygame.sprite.Sprite):
         pygame.draw.rect(self.image, (255, 165, 0), (0, 0, 500, 80), 2)  # Orange border
         
         # Get text with game_font_medium
-        title_text = game_font_medium.render("NYTT VÅPEN LÅST OPP!", True, (255, 165, 0))  # Orange text
-        desc_text = game_font_small.render("Du har låst opp hagle (trykk 2 for å bruke)", True, HVIT)
-        tip_text = game_font_small.render("Bred spredning, kort rekkevidde", True, HVIT)
+        title_text = text_cache.render(game_font_medium, "NYTT VÅPEN LÅST OPP!", True, (255, 165, 0))  # Orange text
+        desc_text = text_cache.render(game_font_small, "Du har låst opp hagle (trykk 2 for å bruke)", True, HVIT)
+        tip_text = text_cache.render(game_font_small, "Bred spredning, kort rekkevidde", True, HVIT)
         
         # Center the text
         self.image.blit(title_text, (250 - title_text.get_width()//2, 5))
@@ -531,190 +614,232 @@ class WeaponUnlockNotification(pygame.sprite.Sprite):
         self.image.blit(tip_text, (250 - tip_text.get_width()//2, 55))
     
     def update(self):
-        self.timer -= 1
+        self.timer -= self.kontekst.tikk_skala
         if self.timer <= 0:
             self.kill()
 
 # Enemy projectile for Impossible mode
 class FiendeProsjektil(pygame.sprite.Sprite):
-    def __init__(self, x, y):
+    layer = LAG_PROSJEKTILER  # Draw-order layer
+    pool = None
+    i_pool = False
+
+    def __init__(self, kontekst, x, y):
         super().__init__()
-        self.image = pygame.Surface((6, 15))
-        self.image.fill(GUL)
+        self.kontekst = kontekst
+        self.image = prosjektil_bilde((6, 15), GUL)
         self.rect = self.image.get_rect()
+        self.reset(x, y)
+
+    def reset(self, x, y):
         self.rect.centerx = x
         self.rect.top = y
         self.hastighet = 7  # Slightly slower than player shots
+        self.rest_x = self.rest_y = 0.0
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
 
     def update(self):
-        self.rect.y += self.hastighet
+        flytt(self, 0, self.hastighet)
         # Remove projectile if it goes off screen
         if self.rect.top > HOYDE:
             self.kill()
 
+# Per-session simulation state, handed to every entity of a GameSession, so several
+# sessions (a replay next to a running game, tests at different tick rates) can run
+# in one process without touching each other
+class SpillKontekst:
+    """Tick scale, random streams, projectile pools and sprite atlas of one session.
+
+    rng drives gameplay (spawns, enemy speeds and fire) and effekt_rng cosmetic
+    effects, so effects never shift the gameplay sequence; seed() them both to
+    reproduce a game exactly."""
+
+    def __init__(self, tick_rate=STANDARD_TICK_RATE, pool_cap=256, atlas=None):
+        self.tick_rate = tick_rate
+        self.tikk_skala = STANDARD_TICK_RATE / tick_rate
+        self.rng = random.Random()
+        self.effekt_rng = random.Random()
+        self.atlas = atlas if atlas is not None else SpriteAtlas()
+        # Projectiles are recycled instead of allocating a sprite per shot
+        self.skudd_pool = ProjectilePool(self, Skudd, pool_cap)
+        self.explosive_pool = ProjectilePool(self, ExplosiveShot, pool_cap)
+        self.shotgun_pool = ProjectilePool(self, ShotgunShot, pool_cap)
+        self.fiende_prosjektil_pool = ProjectilePool(self, FiendeProsjektil, pool_cap)
+        self.projectile_pools = {
+            "Skudd": self.skudd_pool,
+            "ExplosiveShot": self.explosive_pool,
+            "ShotgunShot": self.shotgun_pool,
+            "FiendeProsjektil": self.fiende_prosjektil_pool,
+        }
+
+    def seed(self, seed, effekt_seed):
+        self.rng.seed(seed)
+        self.effekt_rng.seed(effekt_seed)
+
+    def configure_pools(self, cap, preallocate=0):
+        """Set the idle cap of every projectile pool and optionally fill them up front"""
+        for pool in self.projectile_pools.values():
+            pool.cap = cap
+            del pool.ledige[cap:]
+            if preallocate:
+                pool.preallocate(preallocate, 0, 0)
+
+    def pool_stats(self):
+        return {navn: pool.stats() for navn, pool in self.projectile_pools.items()}
+
 # Enemy class
 class Fiende(pygame.sprite.Sprite):
-    def __init__(self, fiende_bilde, VANSKELIGHETSGRAD):
+    layer = LAG_FIENDER  # Draw-order layer
+
+    def __init__(self, kontekst, fiende_bilde, VANSKELIGHETSGRAD, naa=None):
         super().__init__()
+        self.kontekst = kontekst
+        rng = kontekst.rng
         # Random size between 70% and 120% of original size
-        self.scale_factor = random.uniform(0.7, 1.2)
-        size = int(40 * self.scale_factor)
+        base, lav, hoy = FIENDE_SKALA
+        self.scale_factor = rng.uniform(lav, hoy)
+        self.size = rotation_atlas.size_bucket(int(base * self.scale_factor))
         
-        # Original image for rotation
-        self.original_image = pygame.transform.scale(fiende_bilde, (size, size))
+        # Shared scaled source image - rotated frames come from the rotation atlas
+        self.kilde_bilde = fiende_bilde
+        self.original_image = rotation_atlas.base(fiende_bilde, self.size, kontekst.atlas)
         
         # Random rotation
         self.angle = 0
-        self.rotation_speed = random.uniform(-2, 2)  # Degrees per frame
-        self.image = self.original_image.copy()
+        self.rotation_speed = rng.uniform(-2, 2)  # Degrees per frame
+        self.image = self.original_image
         
         self.rect = self.image.get_rect()
-        self.rect.x = random.randrange(BREDDE - self.rect.width)
-        self.rect.y = random.randrange(-100, -40)
+        self.rect.x = rng.randrange(BREDDE - self.rect.width)
+        self.rect.y = rng.randrange(-100, -40)
         
         # Adjust speed based on difficulty
         if VANSKELIGHETSGRAD == 1:
-            self.hastighet = random.randrange(1, 2)
+            self.hastighet = rng.randrange(1, 2)
         elif VANSKELIGHETSGRAD == 2:
-            self.hastighet = random.randrange(1, 3)
+            self.hastighet = rng.randrange(1, 3)
         else:  # Level 3 or higher
-            self.hastighet = random.randrange(1, 4)
+            self.hastighet = rng.randrange(1, 4)
             
+        self.rest_x = self.rest_y = 0.0
         self.treff = 0  # Always 0 for regular enemies
         self.max_treff = 1  # Regular enemies need 1 hit
         
         # In Impossible mode, enemies can shoot back with low probability
-        self.last_shot = pygame.time.get_ticks()
-        self.shot_delay = random.randint(3000, 8000)  # 3-8 seconds between shots
+        self.last_shot = pygame.time.get_ticks() if naa is None else naa
+        self.shot_delay = rng.randint(3000, 8000)  # 3-8 seconds between shots
         
         # Point value
         self.point_value = 10
 
-    def update(self, VANSKELIGHETSGRAD=None, alle_sprites=None, fiende_prosjektil_gruppe=None):
+    def update(self, VANSKELIGHETSGRAD=None, alle_sprites=None, fiende_prosjektil_gruppe=None, naa=None):
         # Move the enemy
-        self.rect.y += self.hastighet
+        flytt(self, 0, self.hastighet)
         
-        # Update rotation
-        self.angle += self.rotation_speed
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
+        # Update rotation - look up the shared frame and resize the rect in place around its centre
+        self.angle += self.rotation_speed * self.kontekst.tikk_skala
+        self.image = rotation_atlas.frame(self.kilde_bilde, self.size, self.angle, self.kontekst.atlas)
         old_center = self.rect.center
-        self.rect = self.image.get_rect()
+        self.rect.size = self.image.get_size()
         self.rect.center = old_center
         
         # In Impossible mode, let enemies shoot
         if VANSKELIGHETSGRAD == 4:
-            now = pygame.time.get_ticks()
-            if now - self.last_shot > self.shot_delay and random.random() < 0.01:  # 1% chance per frame
+            now = pygame.time.get_ticks() if naa is None else naa
+            if now - self.last_shot > self.shot_delay and self.kontekst.rng.random() < 0.01 * self.kontekst.tikk_skala:  # 1% chance per frame
                 self.last_shot = now
                 self.shoot(alle_sprites, fiende_prosjektil_gruppe)
     
     def shoot(self, alle_sprites, fiende_prosjektil_gruppe):
         if self.rect.bottom > 0:  # Only shoot if the enemy is visible
-            prosjektil = FiendeProsjektil(self.rect.centerx, self.rect.bottom)
+            prosjektil = self.kontekst.fiende_prosjektil_pool.acquire(self.rect.centerx, self.rect.bottom)
             alle_sprites.add(prosjektil)
             fiende_prosjektil_gruppe.add(prosjektil)
 
 # Class for stronger enemies (level 3)
 class SterkFiende(Fiende):
-    def __init__(self, sterk_fiende_bilde, VANSKELIGHETSGRAD):
-        super().__init__(sterk_fiende_bilde, VANSKELIGHETSGRAD)
+    def __init__(self, kontekst, sterk_fiende_bilde, VANSKELIGHETSGRAD, naa=None):
+        super().__init__(kontekst, sterk_fiende_bilde, VANSKELIGHETSGRAD, naa)
+        rng = kontekst.rng
         # Random size between 80% and 130% of original size
-        self.scale_factor = random.uniform(0.8, 1.3)
-        size = int(50 * self.scale_factor)
+        base, lav, hoy = STERK_FIENDE_SKALA
+        self.scale_factor = rng.uniform(lav, hoy)
+        self.size = rotation_atlas.size_bucket(int(base * self.scale_factor))
         
-        # Original image for rotation
-        self.original_image = pygame.transform.scale(sterk_fiende_bilde, (size, size))
-        self.image = self.original_image.copy()
+        # Shared scaled source image (strong enemies don't rotate)
+        self.kilde_bilde = sterk_fiende_bilde
+        self.original_image = rotation_atlas.base(sterk_fiende_bilde, self.size, kontekst.atlas)
+        self.image = self.original_image
         self.rect = self.image.get_rect()
         
-        self.rect.x = random.randrange(BREDDE - self.rect.width)
-        self.rect.y = random.randrange(-100, -40)
+        self.rect.x = rng.randrange(BREDDE - self.rect.width)
+        self.rect.y = rng.randrange(-100, -40)
         
         # Make strong enemies faster in Hard mode
         if VANSKELIGHETSGRAD == 3:
-            self.hastighet = random.randrange(2, 4)  # Faster in Hard mode
+            self.hastighet = rng.randrange(2, 4)  # Faster in Hard mode
         elif VANSKELIGHETSGRAD == 4:
-            self.hastighet = random.randrange(2, 5)  # Even faster in Impossible mode
+            self.hastighet = rng.randrange(2, 5)  # Even faster in Impossible mode
         else:
-            self.hastighet = random.randrange(1, 3)
+            self.hastighet = rng.randrange(1, 3)
             
         self.treff = 0  # Number of hits needed to destroy (2 for stronger enemies)
         self.max_treff = 2
         self.point_value = 25  # 25 points for strong enemies
         self.rotation_speed = 0  # Make strong enemies static in rotation
 
-    def update(self, VANSKELIGHETSGRAD=None, alle_sprites=None, fiende_prosjektil_gruppe=None):
-        self.rect.y += self.hastighet
+    def update(self, VANSKELIGHETSGRAD=None, alle_sprites=None, fiende_prosjektil_gruppe=None, naa=None):
+        flytt(self, 0, self.hastighet)
         # Skip rotating: self.angle remains unchanged
         # ...existing shooting code...
         if VANSKELIGHETSGRAD == 4:
-            now = pygame.time.get_ticks()
+            now = pygame.time.get_ticks() if naa is None else naa
             # Increase shoot frequency: lower delay uniformly and raise probability to 10% # Increased chance per frame
-            if now - self.last_shot > self.shot_delay and random.random() < 0.1:
+            if now - self.last_shot > self.shot_delay and self.kontekst.rng.random() < 0.1 * self.kontekst.tikk_skala:
                 self.last_shot = now
                 self.shoot(alle_sprites, fiende_prosjektil_gruppe)
 
 # Explosion class
 class Eksplosjon(pygame.sprite.Sprite):
-    def __init__(self, center):
+    layer = LAG_EFFEKTER  # Draw-order layer
+
+    def __init__(self, center, naa=None):
         super().__init__()
-        self.image = pygame.Surface((50, 50))
-        pygame.draw.circle(self.image, (255, 165, 0), (25, 25), 25)  # Orange circle
-        self.image.set_colorkey(SVART)
+        self.frames = eksplosjon_frames()
+        self.image = self.frames[0]
         self.rect = self.image.get_rect()
         self.rect.center = center
         self.frame = 0
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = pygame.time.get_ticks() if naa is None else naa
         self.frame_rate = 50
 
-    def update(self):
-        now = pygame.time.get_ticks()
+    def update(self, naa=None):
+        now = pygame.time.get_ticks() if naa is None else naa
         if now - self.last_update > self.frame_rate:
             self.last_update = now
             self.frame += 1
-            if self.frame == 6:
+            if self.frame == len(self.frames):
                 self.kill()
             else:
                 center = self.rect.center
-                self.image = pygame.Surface((50 - self.frame * 8, 50 - self.frame * 8))
-                pygame.draw.circle(self.image, (255, 165, 0), 
-                                  (int((50 - self.frame * 8)/2), int((50 - self.frame * 8)/2)), 
-                                  int((50 - self.frame * 8)/2))
-                self.image.set_colorkey(SVART)
-                self.rect = self.image.get_rect()
+                self.image = self.frames[self.frame]
+                self.rect.size = self.image.get_size()
                 self.rect.center = center
 
-# Particle class for visual effects
-class Partikkel(pygame.sprite.Sprite):
-    def __init__(self, pos, vinkel, hastighet):
-        super().__init__()
-        self.image = pygame.Surface((4, 4))
-        self.image.fill(BLA)
-        self.rect = self.image.get_rect()
-        self.rect.center = pos
-        self.x = pos[0]
-        self.y = pos[1]
-        self.hastighet_x = math.cos(vinkel) * hastighet
-        self.hastighet_y = math.sin(vinkel) * hastighet
-        self.levetid = 30
-        
-    def update(self):
-        self.x += self.hastighet_x
-        self.y += self.hastighet_y
-        self.rect.centerx = int(self.x)
-        self.rect.centery = int(self.y)
-        self.levetid -= 1
-        if self.levetid <= 0:
-            self.kill()
-
 # Power bonus class
 class Kraftbonus(pygame.sprite.Sprite):
-    def __init__(self, liv_bilde=None):
+    layer = LAG_FIENDER  # Draw-order layer
+
+    def __init__(self, kontekst, liv_bilde=None):
         super().__init__()
+        self.kontekst = kontekst
         if liv_bilde:
-            # Use the provided life image and scale it appropriately
-            size = 30
-            self.image = pygame.transform.scale(liv_bilde, (size, size))
+            # Use the provided life image at bonus size
+            self.image = scaled_assets.scaled(liv_bilde, BONUS_SIZE, kontekst.atlas)
         else:
             # Fallback to the blue circle if no image is provided
             self.image = pygame.Surface((30, 30))
@@ -722,12 +847,13 @@ class Kraftbonus(pygame.sprite.Sprite):
             self.image.set_colorkey(SVART)
         
         self.rect = self.image.get_rect()
-        self.rect.x = random.randrange(BREDDE - self.rect.width)
-        self.rect.y = random.randrange(-100, -40)
+        self.rect.x = kontekst.rng.randrange(BREDDE - self.rect.width)
+        self.rect.y = kontekst.rng.randrange(-100, -40)
         self.hastighet = 3
+        self.rest_x = self.rest_y = 0.0
 
     def update(self):
-        self.rect.y += self.hastighet
+        flytt(self, 0, self.hastighet)
         # If bonus reaches bottom, remove it
         if self.rect.top > HOYDE:
             self.kill()
@@ -743,12 +869,6 @@ def increase_multiplier(score_multiplier, consecutive_hits):
     new_multiplier = min(5.0, 1.0 + (consecutive_hits * 0.1))
     return new_multiplier, consecutive_hits
 
-# Create stars for background
-def create_stars(star_gruppe, count=100):
-    for i in range(count):
-        star = Star()
-        star_gruppe.add(star)
-
 # Set requirements for each level
 def set_level_requirements(level):
     """Set enemies and goals for selected level (easier settings)"""
@@ -787,20 +907,20 @@ def set_level_requirements(level):
 # UI helper functions
 def draw_level_progress(skjerm, poeng, LEVEL, game_font_small):
     level_reqs = set_level_requirements(LEVEL)
-    progress_text = game_font_small.render(f"Progress: {poeng}/{level_reqs['target_score']}", True, HVIT)
+    progress_text = text_cache.render(game_font_small, f"Progress: {poeng}/{level_reqs['target_score']}", True, HVIT)
     skjerm.blit(progress_text, (BREDDE//2 - progress_text.get_width()//2, 10))
 
 def draw_multiplier(skjerm, score_multiplier, game_font_small):
-    multiplier_text = game_font_small.render(f"Multiplier: x{score_multiplier:.1f}", True, (255, 165, 0))
+    multiplier_text = text_cache.render(game_font_small, f"Multiplier: x{score_multiplier:.1f}", True, (255, 165, 0))
     skjerm.blit(multiplier_text, (BREDDE//2 - multiplier_text.get_width()//2, 40))
 
-def draw_enemy_points(skjerm, fiende_bilde, sterk_fiende_bilde, score_multiplier, game_font_small, VANSKELIGHETSGRAD, LEVEL_MODE=False, LEVEL=1):
+def draw_enemy_points(skjerm, fiende_bilde, sterk_fiende_bilde, score_multiplier, game_font_small, VANSKELIGHETSGRAD, LEVEL_MODE=False, LEVEL=1, atlas=None):
     try:
         # Create small icons and show current point values
-        normal_icon_size = 25
+        normal_icon_size = NORMAL_IKON_SIZE[0]
         # Use safe scaling with error handling
         try:
-            normal_icon = pygame.transform.scale(fiende_bilde, (normal_icon_size, normal_icon_size))
+            normal_icon = scaled_assets.scaled(fiende_bilde, NORMAL_IKON_SIZE, atlas)
             skjerm.blit(normal_icon, (10, 100))
         except:
             # If image scaling fails, use a simple rectangle instead
@@ -809,14 +929,14 @@ def draw_enemy_points(skjerm, fiende_bilde, sterk_fiende_bilde, score_multiplier
             skjerm.blit(normal_icon, (10, 100))
             
         normal_points = int(10 * score_multiplier)
-        normal_text = game_font_small.render(f"{normal_points} poeng", True, HVIT)
+        normal_text = text_cache.render(game_font_small, f"{normal_points} poeng", True, HVIT)
         skjerm.blit(normal_text, (40, 110))
         
         # Only show strong enemy points for Hard/Impossible mode or in Level Mode with sufficient level
         if VANSKELIGHETSGRAD >= 3 or (LEVEL_MODE and LEVEL >= 3):
-            strong_icon_size = 30
+            strong_icon_size = STERK_IKON_SIZE[0]
             try:
-                strong_icon = pygame.transform.scale(sterk_fiende_bilde, (strong_icon_size, strong_icon_size))
+                strong_icon = scaled_assets.scaled(sterk_fiende_bilde, STERK_IKON_SIZE, atlas)
                 skjerm.blit(strong_icon, (10, 130))
             except:
                 strong_icon = pygame.Surface((strong_icon_size, strong_icon_size))
@@ -824,13 +944,14 @@ def draw_enemy_points(skjerm, fiende_bilde, sterk_fiende_bilde, score_multiplier
                 skjerm.blit(strong_icon, (10, 130))
                 
             strong_points = int(25 * score_multiplier)
-            strong_text = game_font_small.render(f"{strong_points} poeng", True, HVIT)
+            strong_text = text_cache.render(game_font_small, f"{strong_points} poeng", True, HVIT)
             skjerm.blit(strong_text, (45, 140))
     except Exception as e:
         print(f"Error in draw_enemy_points: {e}")
 
 # Check and save highscores
-def check_and_update_highscore(poeng, VANSKELIGHETSGRAD, high_scores, LEVEL, LEVEL_MODE):
+def check_and_update_highscore(poeng, VANSKELIGHETSGRAD, high_scores, LEVEL, LEVEL_MODE, lagre=True):
+    # lagre=False updates high_scores in memory only (replays and other headless runs)
     updated = False
     
     # Map difficulty level to keys in config
@@ -851,14 +972,15 @@ def check_and_update_highscore(poeng, VANSKELIGHETSGRAD, high_scores, LEVEL, LEV
             updated = True
             
             # Check for unlock of impossible mode
-            if current_diff == "hard" and poeng >= 1000:
+            if current_diff == "hard" and poeng >= 1000 and lagre:
                 game_config = load_config()
                 game_config["unlock_impossible"] = True
                 save_config(game_config)
     
     # Save updated high scores
     if updated:
-        save_high_scores(high_scores)
+        if lagre:
+            save_high_scores(high_scores)
         return True
     
     return False
@@ -873,40 +995,8 @@ def get_current_high_score(VANSKELIGHETSGRAD, LEVEL, LEVEL_MODE, high_scores):
         current_diff = diff_map.get(VANSKELIGHETSGRAD)
         return high_scores.get(current_diff, 0)
 
-# Check for level completion in level-mode
-def check_level_complete(LEVEL, poeng, LEVEL_MODE, VANSKELIGHETSGRAD, high_scores):
-    if LEVEL_MODE:
-        level_reqs = set_level_requirements(LEVEL)
-        if poeng >= level_reqs["target_score"]:
-            # Check for high score before level change
-            check_and_update_highscore(poeng, VANSKELIGHETSGRAD, high_scores, LEVEL, LEVEL_MODE)
-            
-            # Level completed
-            new_level = LEVEL + 1
-            
-            # Update max reached level
-            game_config = load_config()
-            if new_level > game_config["max_level_reached"]:
-                game_config["max_level_reached"] = new_level
-                save_config(game_config)
-                
-                # Check for new skins based on level
-                if new_level == 5 and "level5_skin" not in game_config["unlocked_skins"]:
-                    game_config["unlocked_skins"].append("level5_skin")
-                    save_config(game_config)
-                
-                # Check for shotgun unlock at level 5
-                if new_level > 5 and not game_config.get("shotgun_unlocked", False):
-                    game_config["shotgun_unlocked"] = True
-                    save_config(game_config)
-                    return True, new_level, True  # Return that shotgun was unlocked
-            
-            return True, new_level, False
-    
-    return False, LEVEL, False
-
 # Function to create enemies based on difficulty
-def opprett_fiender(LEVEL_MODE, LEVEL, VANSKELIGHETSGRAD, fiende_bilde, sterk_fiende_bilde, alle_sprites, fiende_gruppe):
+def opprett_fiender(kontekst, LEVEL_MODE, LEVEL, VANSKELIGHETSGRAD, fiende_bilde, sterk_fiende_bilde, alle_sprites, fiende_gruppe, naa=None):
     # Clear any existing enemies
     for sprite in fiende_gruppe:
         sprite.kill()
@@ -931,155 +1021,148 @@ def opprett_fiender(LEVEL_MODE, LEVEL, VANSKELIGHETSGRAD, fiende_bilde, sterk_fi
             antall_sterke = 5  # Impossible: Many strong enemies and they shoot
             
     for i in range(antall_fiender):
-        enemy = Fiende(fiende_bilde, VANSKELIGHETSGRAD)
+        enemy = Fiende(kontekst, fiende_bilde, VANSKELIGHETSGRAD, naa)
         alle_sprites.add(enemy)
         fiende_gruppe.add(enemy)
     for i in range(antall_sterke):
-        strong_enemy = SterkFiende(sterk_fiende_bilde, VANSKELIGHETSGRAD)
+        strong_enemy = SterkFiende(kontekst, sterk_fiende_bilde, VANSKELIGHETSGRAD, naa)
         alle_sprites.add(strong_enemy)
         fiende_gruppe.add(strong_enemy)
     return antall_fiender + antall_sterke
 
+# Pre-rendered whip graphics: one short beam segment and the spark dots.
+# Rotated segments are cached per angle step, so a whip frame costs about the
+# beam's own area instead of a screen-sized alpha surface.
+WHIP_SEGMENT = 32       # Length of one beam segment in pixels
+WHIP_BREDDE = 12        # Thickness of the outer glow
+WHIP_VINKEL_STEG = 2    # Degrees between cached segment rotations
+_whip_segmenter = LRUCache(256)
+_whip_prikker = {}
+
+def whip_segment(angle):
+    steg = int(round(angle / WHIP_VINKEL_STEG)) % (360 // WHIP_VINKEL_STEG)
+    def lag():
+        segment = pygame.Surface((WHIP_SEGMENT, WHIP_BREDDE), pygame.SRCALPHA)
+        midt = WHIP_BREDDE // 2
+        # Outer glow first, bright core last
+        pygame.draw.line(segment, (180, 230, 255, 100), (0, midt), (WHIP_SEGMENT, midt), 12)
+        pygame.draw.line(segment, (100, 220, 255, 180), (0, midt), (WHIP_SEGMENT, midt), 8)
+        pygame.draw.line(segment, (0, 200, 255, 255), (0, midt), (WHIP_SEGMENT, midt), 5)
+        return pygame.transform.rotate(segment, steg * WHIP_VINKEL_STEG)
+    return _whip_segmenter.get(steg, lag)
+
+def whip_prikk(size):
+    prikk = _whip_prikker.get(size)
+    if prikk is None:
+        prikk = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(prikk, (150, 220, 255, 200), (size, size), size)
+        _whip_prikker[size] = prikk
+    return prikk
+
 # Electric Whip animation class
 class ElectricWhip(pygame.sprite.Sprite):
-    def __init__(self, player_pos, screen_width, screen_height):
+    layer = LAG_EFFEKTER  # Draw-order layer
+
+    def __init__(self, kontekst, player_pos, screen_width, screen_height):
         super().__init__()
+        self.kontekst = kontekst
         self.center_pos = player_pos
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.length = screen_width * 1.5  # Make it long enough to reach all corners
-        self.angle = 0  # Start at 0 degrees (pointing left) instead of 90
-        self.angular_speed = 6  # Degrees per frame - reduced from 15 to 6 for smoother sweep
+        self.angle = 0  # Start at 0 degrees (pointing right) and sweep to 180 (pointing left)
+        self.angular_speed = 12  # Degrees per frame - the sweep used to be advanced twice per frame at 6
         self.done = False
         self.enemies_hit = set()  # Track enemies already hit
         
-        # Create the initial image (a horizontal line pointing left)
-        self.image = pygame.Surface((self.length, self.length), pygame.SRCALPHA)
+        # The beam is queued from beam_blits() by the session's batch renderer, so the
+        # sprite image is just an empty placeholder
+        self.image = pygame.Surface((1, 1), pygame.SRCALPHA)
         self.rect = self.image.get_rect()
         self.rect.center = player_pos
+        self.segmenter = []
+        self.prikker = []
         self.update_image()
     
     def update_image(self):
-        # Clear the image
-        self.image.fill((0, 0, 0, 0))
-        
-        # Calculate end point of line based on current angle
+        # Lay out the beam segments and sparks for the current angle, relative to the whip centre
         angle_rad = math.radians(self.angle)
-        end_x = self.length // 2
-        end_y = self.length // 2
-        
-        # Calculate start point (center of image)
-        start_x = self.length // 2
-        start_y = self.length // 2
-        
-        # Calculate endpoint based on angle
-        dx = math.cos(angle_rad) * self.length // 2
-        dy = -math.sin(angle_rad) * self.length // 2  # Negative because pygame's y-axis is flipped
-        
-        # Draw the main laser line - make it thicker
-        pygame.draw.line(self.image, (0, 200, 255, 255), (start_x, start_y), 
-                        (start_x + dx, start_y + dy), 5)  # Increased thickness from 3 to 5
-        
-        # Add some glow effect with additional lines - make them thicker
-        pygame.draw.line(self.image, (100, 220, 255, 180), (start_x, start_y), 
-                        (start_x + dx, start_y + dy), 8)  # Increased thickness and opacity
-        pygame.draw.line(self.image, (180, 230, 255, 100), (start_x, start_y), 
-                        (start_x + dx, start_y + dy), 12)  # Increased thickness and opacity
-        
-        # Add more electricity particles along the line
-        for i in range(20):  # Increased from 10 to 20 particles
-            dist = random.random()
-            particle_x = start_x + dx * dist
-            particle_y = start_y + dy * dist
-            
-            # Random offset perpendicular to line
-            perp_angle = angle_rad + math.pi/2
-            offset = random.uniform(-10, 10)  # Increased offset range from -8,8 to -10,10
-            particle_x += math.cos(perp_angle) * offset
-            particle_y -= math.sin(perp_angle) * offset
-            
-            size = random.randint(2, 6)  # Increased max size from 4 to 6
-            alpha = random.randint(150, 255)  # Increased opacity range
-            pygame.draw.circle(self.image, (150, 220, 255, alpha), 
-                              (int(particle_x), int(particle_y)), size)
+        retning_x = math.cos(angle_rad)
+        retning_y = -math.sin(angle_rad)  # Negative because pygame's y-axis is flipped
+        halv = self.length / 2
+
+        segment = whip_segment(self.angle)
+        bredde, hoyde = segment.get_size()
+        self.segmenter = []
+        avstand = WHIP_SEGMENT / 2
+        while avstand < halv:
+            self.segmenter.append((segment, (retning_x * avstand - bredde / 2, retning_y * avstand - hoyde / 2)))
+            avstand += WHIP_SEGMENT
+
+        # Electricity particles along the line with a random offset perpendicular to it,
+        # from the cosmetic stream so the sparks don't shift the gameplay sequence
+        effekt_rng = self.kontekst.effekt_rng
+        self.prikker = []
+        for i in range(20):
+            dist = effekt_rng.random() * halv
+            offset = effekt_rng.uniform(-10, 10)
+            size = effekt_rng.randint(2, 6)
+            x = retning_x * dist - retning_y * offset
+            y = retning_y * dist + retning_x * offset
+            self.prikker.append((whip_prikk(size), (x - size, y - size)))
+
+    def beam_blits(self):
+        """(image, position) pairs that draw the beam and sparks"""
+        cx, cy = self.rect.center
+        return [(bilde, (cx + x, cy + y)) for bilde, (x, y) in self.segmenter + self.prikker]
     
-    def update(self, fiende_gruppe=None, alle_sprites=None, eksplosjon_lyd=None, score_multiplier=1.0):
-        # Update angle by moving from 0 to 180 degrees (left to right sweep)
-        self.angle += self.angular_speed
+    def update(self, fiende_gruppe=None, alle_sprites=None, eksplosjon_lyd=None, score_multiplier=1.0, naa=None, partikler=None):
+        # Update angle by moving from 0 to 180 degrees (right to left sweep). The last
+        # step is clamped to 180, so the final partial sweep is still checked for hits
+        forrige_angle = self.angle
+        self.angle = min(180, self.angle + self.angular_speed * self.kontekst.tikk_skala)
+        ferdig = self.angle >= 180  # End when pointing left
         
-        if self.angle >= 180:  # End when pointing right instead of -90
-            self.kill()
-            self.done = True
-            return
-            
         # Update image with new angle
-        self.update_image()
+        if not ferdig:
+            self.update_image()
         
         # Check for collisions with enemies
         if fiende_gruppe and alle_sprites:
-            for fiende in list(fiende_gruppe):
-                # Skip if already hit
-                if fiende in self.enemies_hit:
-                    continue
-                    
-                # Check if the enemy is hit by the whip
-                fiende_center = fiende.rect.center
-                whip_center = self.rect.center
-                
-                # Create a vector from whip origin to enemy center
-                dx = fiende_center[0] - whip_center[0]
-                dy = fiende_center[1] - whip_center[1]
+            fiender = [fiende for fiende in fiende_gruppe if fiende not in self.enemies_hit]
+            for i in self.swept_hits([fiende.rect.center for fiende in fiender], forrige_angle):
+                fiende = fiender[i]
+                # Mark as hit
+                self.enemies_hit.add(fiende)
                 
-                # Convert to polar coordinates
-                distance = math.sqrt(dx*dx + dy*dy)
-                angle_to_enemy = math.degrees(math.atan2(-dy, dx))  # Negative dy because y increases downward
+                # Create explosion
+                eks = Eksplosjon(fiende.rect.center, naa)
+                alle_sprites.add(eks)
                 
-                # Normalize angle_to_enemy to be in the range [0, 360)
-                while angle_to_enemy < 0:
-                    angle_to_enemy += 360
-                while angle_to_enemy >= 360:
-                    angle_to_enemy -= 360
-                
-                # If enemy is within whip length and the angle is close to the whip's angle
-                # (giving the whip some thickness in the angular dimension)
-                angle_diff = abs((self.angle - angle_to_enemy) % 360)
-                if angle_diff > 180: 
-                    angle_diff = 360 - angle_diff
-                    
-                if distance <= self.length and angle_diff < 15:  # 15 degrees of angular thickness
-                    # Mark as hit
-                    self.enemies_hit.add(fiende)
+                # Add some electrical particles
+                if partikler is not None:
+                    partikler.spawn_electric(fiende.rect.center, 10)
                     
-                    # Create explosion
-                    if alle_sprites:
-                        eks = Eksplosjon(fiende.rect.center)
-                        alle_sprites.add(eks)
-                    
-                    # Add some electrical particles
-                    for _ in range(10):
-                        vinkel = random.uniform(0, 2 * math.pi)
-                        hastighet = random.uniform(2, 5)
-                        partikkel = ElectricalParticle(fiende.rect.center, vinkel, hastighet)
-                        if alle_sprites:
-                            alle_sprites.add(partikkel)
-                        
-                    # Play sound
-                    if eksplosjon_lyd:
-                        eksplosjon_lyd.play(maxtime=0, fade_ms=0)
-
-# Electrical particle for whip effect
-class ElectricalParticle(Partikkel):
-    def __init__(self, pos, vinkel, hastighet):
-        super().__init__(pos, vinkel, hastighet)
-        # Override base particle color with electric blue
-        self.image.fill((100, 200, 255))
-        # Shorter lifespan
-        self.levetid = 15
-        
-    def update(self):
-        super().update()
-        # Add flickering effect
-        if random.random() < 0.5:
-            self.image.fill((200, 230, 255))  # Brighter color
-        else:
-            self.image.fill((80, 150, 255))  # Darker color
\ No newline at end of file
+                # Play sound
+                if eksplosjon_lyd:
+                    eksplosjon_lyd.play(maxtime=0, fade_ms=0)
+
+        if ferdig:
+            self.kill()
+            self.done = True
+
+    def swept_hits(self, sentre, forrige_angle, thickness=15):
+        """Indices of the centres inside the sector the whip swept this tick.
+        The sector runs from forrige_angle to the current angle, widened by thickness
+        degrees on both sides, so no enemy is skipped however fast the whip turns."""
+        if not sentre:
+            return []
+        sentre = np.asarray(sentre, dtype=np.float64)
+        dx = sentre[:, 0] - self.rect.centerx
+        dy = self.rect.centery - sentre[:, 1]  # Flipped because y increases downward
+        innenfor = dx * dx + dy * dy <= self.length * self.length
+        # Angle of each enemy measured from the start of the widened sector, in [0, 360)
+        start = forrige_angle - thickness
+        vinkel = (np.degrees(np.arctan2(dy, dx)) - start) % 360
+        truffet = innenfor & (vinkel < (self.angle - forrige_angle) + 2 * thickness)
+        return np.flatnonzero(truffet).tolist()
@@ -0,0 +1,101 @@
+class SpatialHash:
+    """Uniform-grid broadphase for sprite collisions.
+
+    Sprites are bucketed by the grid cells their rect covers, so a query only tests
+    sprites in nearby cells instead of every sprite in the group. Rebuild it once per
+    tick with build(); queries return sprites in the order they were inserted, which
+    keeps hit order the same as pygame's group iteration."""
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.celler = {}
+        self.indeks = {}  # Sprite -> insertion order
+
+    def clear(self):
+        self.celler.clear()
+        self.indeks.clear()
+
+    def __len__(self):
+        return len(self.indeks)
+
+    def _celle_omraade(self, rect):
+        c = self.cell_size
+        return rect.left // c, rect.top // c, (rect.right - 1) // c, (rect.bottom - 1) // c
+
+    def insert(self, sprite):
+        self.indeks[sprite] = len(self.indeks)
+        x0, y0, x1, y1 = self._celle_omraade(sprite.rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                celle = self.celler.get((cx, cy))
+                if celle is None:
+                    self.celler[(cx, cy)] = [sprite]
+                else:
+                    celle.append(sprite)
+
+    def build(self, gruppe):
+        """Rebuild the grid from a sprite group"""
+        self.clear()
+        for sprite in gruppe:
+            self.insert(sprite)
+        return self
+
+    def query(self, rect):
+        """Sprites whose rect overlaps rect, in insertion order"""
+        x0, y0, x1, y1 = self._celle_omraade(rect)
+        if x0 == x1 and y0 == y1:
+            # Common case: the query fits in one cell, which is already in insertion order
+            return [sprite for sprite in self.celler.get((x0, y0), ()) if rect.colliderect(sprite.rect)]
+        funnet = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for sprite in self.celler.get((cx, cy), ()):
+                    if sprite not in funnet and rect.colliderect(sprite.rect):
+                        funnet.add(sprite)
+        return sorted(funnet, key=self.indeks.__getitem__)
+
+
+    def query_radius(self, sentrum, radius):
+        """Sprites whose centre lies within radius of sentrum, in insertion order"""
+        sx, sy = sentrum
+        r2 = radius * radius
+        c = self.cell_size
+        funnet = set()
+        for cx in range(int(sx - radius) // c, int(sx + radius) // c + 1):
+            for cy in range(int(sy - radius) // c, int(sy + radius) // c + 1):
+                for sprite in self.celler.get((cx, cy), ()):
+                    x, y = sprite.rect.center
+                    if (x - sx) * (x - sx) + (y - sy) * (y - sy) <= r2:
+                        funnet.add(sprite)
+        return sorted(funnet, key=self.indeks.__getitem__)
+
+
+# Drop-in replacements for pygame.sprite.spritecollide/groupcollide backed by a SpatialHash.
+# Pass a hash that is already built for the group to reuse it between queries.
+
+def spritecollide(sprite, gruppe, dokill, spatial_hash=None):
+    if spatial_hash is None:
+        spatial_hash = SpatialHash().build(gruppe)
+    treff = spatial_hash.query(sprite.rect)
+    if dokill:
+        for truffet in treff:
+            truffet.kill()
+    return treff
+
+
+def groupcollide(gruppe_a, gruppe_b, dokilla, dokillb, spatial_hash=None):
+    if spatial_hash is None:
+        spatial_hash = SpatialHash().build(gruppe_b)
+    kollisjoner = {}
+    for sprite in gruppe_a.sprites():
+        treff = spatial_hash.query(sprite.rect)
+        if dokillb:
+            # Like pygame, a sprite killed by an earlier hit can't be hit again
+            treff = [truffet for truffet in treff if truffet in gruppe_b]
+            for truffet in treff:
+                truffet.kill()
+        if treff:
+            kollisjoner[sprite] = treff
+            if dokilla:
+                sprite.kill()
+    return kollisjoner
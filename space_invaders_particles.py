@@ -0,0 +1,181 @@
+import math
+import numpy as np
+import pygame
+from space_invaders_classes import BREDDE, HOYDE, BLA, HVIT
+
+# Particle colors
+PARTIKKEL_FARGE = BLA
+ELEKTRISK_FARGE = (100, 200, 255)
+ELEKTRISK_LYS = (200, 230, 255)    # Flicker colors for electrical particles
+ELEKTRISK_MORK = (80, 150, 255)
+
+
+def tegn_firkanter(skjerm, x, y, farge, storrelse):
+    """Draw size x size squares with top-left corners at the x, y arrays in one batched pass.
+    farge is one RGB color or an array with one color per square."""
+    bredde, hoyde = skjerm.get_size()
+    farge = np.asarray(farge)
+    # Squares are drawn whole or not at all, so they never need clipping
+    synlig = (x >= 0) & (x <= bredde - storrelse) & (y >= 0) & (y <= hoyde - storrelse)
+    x, y = x[synlig], y[synlig]
+    if farge.ndim == 2:
+        farge = farge[synlig]
+    if skjerm.get_bytesize() != 4:
+        # No 32-bit pixel access - fall back to one fill per square
+        farger = farge.tolist() if farge.ndim == 2 else [farge.tolist()] * len(x)
+        for px, py, f in zip(x.tolist(), y.tolist(), farger):
+            skjerm.fill(f, (px, py, storrelse, storrelse))
+        return
+
+    # Map the colors to the surface pixel format in one go
+    farge = farge.astype(np.uint32)
+    r_skift, g_skift, b_skift, _ = skjerm.get_shifts()
+    r_tap, g_tap, b_tap, _ = skjerm.get_losses()
+    piksel = ((farge[..., 0] >> r_tap) << r_skift) | ((farge[..., 1] >> g_tap) << g_skift) | ((farge[..., 2] >> b_tap) << b_skift)
+    piksel |= np.uint32(skjerm.get_masks()[3])  # Opaque on surfaces with alpha
+
+    # Write the squares straight into the pixel buffer, one vectorized write per pixel offset
+    rad = skjerm.get_pitch() // 4
+    buffer = np.frombuffer(skjerm.get_buffer(), np.uint32)
+    start = y * rad + x
+    for dy in range(storrelse):
+        for dx in range(storrelse):
+            buffer[start + (dy * rad + dx)] = piksel
+    del buffer  # Release the surface lock
+
+
+class ParticleSystem:
+    """All effect particles in one set of NumPy arrays (structure of arrays).
+
+    Position, velocity, lifetime and color are stored per particle in flat arrays,
+    so update() moves every live particle in one vectorized step and draw() writes
+    them to the screen in one batched pass instead of one sprite blit each."""
+    STORRELSE = 4  # Particles are drawn as 4x4 squares
+
+    def __init__(self, capacity=65536, seed=None, tikk_skala=1.0):
+        self.capacity = capacity
+        self.tikk_skala = tikk_skala  # Speeds and lifetimes are per 60 FPS frame
+        self.antall = 0  # Live particles are always packed into [0, antall)
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.levetid = np.zeros(capacity, np.float32)
+        self.farge = np.zeros((capacity, 3), np.uint8)
+        self.flimmer = np.zeros(capacity, bool)  # Electrical particles flicker between two colors
+        self.rng = np.random.default_rng(seed)
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def clear(self):
+        self.antall = 0
+
+    def __len__(self):
+        return self.antall
+
+    def spawn_burst(self, pos, antall, hastighet_min, hastighet_max, farge=PARTIKKEL_FARGE, levetid=30, flimmer=False):
+        """Spawn particles flying out from pos in random directions.
+        Particles beyond the capacity are dropped."""
+        antall = min(antall, self.capacity - self.antall)
+        if antall <= 0:
+            return
+        start, slutt = self.antall, self.antall + antall
+        vinkel = self.rng.uniform(0, 2 * math.pi, antall)
+        hastighet = self.rng.uniform(hastighet_min, hastighet_max, antall)
+        self.x[start:slutt] = pos[0]
+        self.y[start:slutt] = pos[1]
+        self.vx[start:slutt] = np.cos(vinkel) * hastighet
+        self.vy[start:slutt] = np.sin(vinkel) * hastighet
+        self.levetid[start:slutt] = levetid
+        self.farge[start:slutt] = farge
+        self.flimmer[start:slutt] = flimmer
+        self.antall = slutt
+
+    def spawn_explosion(self, pos, antall=10):
+        """Blue burst used when a bonus is collected"""
+        self.spawn_burst(pos, antall, 1, 3, PARTIKKEL_FARGE, 30)
+
+    def spawn_electric(self, pos, antall=10):
+        """Short-lived flickering burst used for whip hits"""
+        self.spawn_burst(pos, antall, 2, 5, ELEKTRISK_FARGE, 15, flimmer=True)
+
+    def update(self):
+        n = self.antall
+        if n == 0:
+            return
+        skala = self.tikk_skala
+        self.x[:n] += self.vx[:n] * skala
+        self.y[:n] += self.vy[:n] * skala
+        self.levetid[:n] -= skala
+
+        # Flicker: every electrical particle picks a bright or dark color each tick
+        flimmer = np.flatnonzero(self.flimmer[:n])
+        if len(flimmer):
+            lys = self.rng.random(len(flimmer)) < 0.5
+            self.farge[flimmer] = np.where(lys[:, None], ELEKTRISK_LYS, ELEKTRISK_MORK)
+
+        # Compact the live particles to the front of the arrays
+        levende = np.flatnonzero(self.levetid[:n] > 0)
+        if len(levende) < n:
+            m = len(levende)
+            for felt in (self.x, self.y, self.vx, self.vy, self.levetid, self.farge, self.flimmer):
+                felt[:m] = felt[levende]
+            self.antall = m
+
+    def draw(self, skjerm, alpha=1.0):
+        """Draw all live particles; alpha interpolates back towards the previous tick"""
+        n = self.antall
+        if n == 0:
+            return
+        tilbake = (1.0 - alpha) * self.tikk_skala
+        halv = self.STORRELSE // 2
+        x = (self.x[:n] - self.vx[:n] * tilbake).astype(np.int32) - halv
+        y = (self.y[:n] - self.vy[:n] * tilbake).astype(np.int32) - halv
+        tegn_firkanter(skjerm, x, y, self.farge[:n], self.STORRELSE)
+
+
+class StarField:
+    """Background star field as an array-backed point field.
+
+    Stars are split into parallax layers: each layer has its own speed and star size,
+    far layers being small and slow. All stars in a layer move in one vectorized step
+    and are drawn in one batched pass, so thousands of stars cost about as much as a few."""
+
+    def __init__(self, antall=100, lag=3, bredde=BREDDE, hoyde=HOYDE, seed=None, tikk_skala=1.0):
+        self.bredde = bredde
+        self.hoyde = hoyde
+        self.tikk_skala = tikk_skala
+        self.rng = np.random.default_rng(seed)
+        self.lag = []
+        lag = max(1, lag)
+        for i in range(lag):
+            dybde = i / (lag - 1) if lag > 1 else 0.5  # 0 = farthest, 1 = nearest
+            # Spread the stars evenly over the layers
+            n = antall // lag + (1 if i < antall % lag else 0)
+            self.lag.append({
+                "speed": 1 + 4 * dybde,               # 1-5 pixels per tick
+                "size": 1 + int(round(2 * dybde)),     # 1-3 pixel stars
+                "x": self.rng.integers(0, bredde, n).astype(np.int32),
+                "y": self.rng.uniform(0, hoyde, n).astype(np.float32),
+            })
+
+    def __len__(self):
+        return sum(len(lag["x"]) for lag in self.lag)
+
+    def update(self):
+        skala = self.tikk_skala
+        for lag in self.lag:
+            y = lag["y"]
+            y += lag["speed"] * skala
+            # Stars that leave the bottom come back at the top at a new x position
+            ute = np.flatnonzero(y > self.hoyde)
+            if len(ute):
+                y[ute] = -lag["size"]
+                lag["x"][ute] = self.rng.integers(0, self.bredde, len(ute))
+
+    def draw(self, skjerm, alpha=1.0):
+        tilbake = (1.0 - alpha) * self.tikk_skala
+        for lag in self.lag:
+            y = (lag["y"] - lag["speed"] * tilbake).astype(np.int32)
+            tegn_firkanter(skjerm, lag["x"], y, HVIT, lag["size"])
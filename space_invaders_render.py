@@ -0,0 +1,202 @@
+import numpy as np
+import pygame
+
+# Draw-order layers for the batched sprite renderer, back to front
+LAG_BAKGRUNN = 0     # Aim line and other things behind the sprites
+LAG_FIENDER = 1      # Enemies, the player and bonuses
+LAG_PROSJEKTILER = 2 # Player shots and enemy projectiles
+LAG_EFFEKTER = 3     # Explosions and the electric whip
+LAG_HUD = 4          # Notifications drawn over the game
+ANTALL_LAG = 5
+
+
+class DirtyRenderer:
+    """Presents frames to the display, optionally pushing only the regions that changed.
+
+    The game still draws every frame onto the display surface as before. With dirty
+    rendering enabled, present() compares the frame with the previous one tile by tile
+    and calls pygame.display.update() with just the changed tiles, merged into row spans.
+    Screens that don't change push nothing, and gameplay pushes only the areas around
+    moving sprites and changed HUD text. Pixels pushed per frame are counted either
+    way, so the two modes can be compared."""
+    TILE = 16  # Tile size in pixels
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.forrige = None  # Copy of the last presented frame
+        self.frames = 0
+        self.pixels_pushed = 0
+        self.last_pixels = 0
+        self.last_rects = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.invalidate()
+        self.reset_stats()
+        return self.enabled
+
+    def reset_stats(self):
+        self.frames = 0
+        self.pixels_pushed = 0
+
+    def invalidate(self):
+        """Push the whole screen next frame (after a mode change or a toggle)"""
+        self.forrige = None
+
+    def _full(self, skjerm):
+        pygame.display.flip()
+        return skjerm.get_width() * skjerm.get_height(), 1
+
+    def _dirty(self, skjerm):
+        if skjerm.get_bytesize() != 4:
+            self.forrige = None
+            return self._full(skjerm)
+        bredde, hoyde = skjerm.get_size()
+        try:
+            buffer = np.frombuffer(skjerm.get_buffer(), np.uint32)
+        except (pygame.error, ValueError):
+            # Display surfaces without direct pixel access (e.g. hardware backends)
+            return self._full(skjerm)
+        frame = buffer.reshape(hoyde, skjerm.get_pitch() // 4)[:, :bredde].copy()
+        del buffer  # Release the surface lock before the display is updated
+
+        forrige, self.forrige = self.forrige, frame
+        if forrige is None or forrige.shape != frame.shape:
+            return self._full(skjerm)
+
+        # Which tiles have any changed pixel
+        t = self.TILE
+        rader, kolonner = -(-hoyde // t), -(-bredde // t)
+        endret = np.zeros((rader * t, kolonner * t), bool)
+        endret[:hoyde, :bredde] = frame != forrige
+        skitne = endret.reshape(rader, t, kolonner, t).any(axis=(1, 3))
+
+        # Merge runs of dirty tiles in each tile row into one rect
+        rects = []
+        for rad in np.flatnonzero(skitne.any(axis=1)):
+            kolonne = skitne[rad]
+            kanter = np.flatnonzero(np.diff(np.concatenate(([0], kolonne.view(np.int8), [0]))))
+            for start, slutt in zip(kanter[::2], kanter[1::2]):
+                rects.append(pygame.Rect(start * t, rad * t, (slutt - start) * t, t).clip(0, 0, bredde, hoyde))
+        if rects:
+            pygame.display.update(rects)
+        return sum(rect.width * rect.height for rect in rects), len(rects)
+
+    def present(self, skjerm):
+        """Show the frame drawn on skjerm"""
+        if self.enabled:
+            pixels, rects = self._dirty(skjerm)
+        else:
+            pixels, rects = self._full(skjerm)
+        self.frames += 1
+        self.pixels_pushed += pixels
+        self.last_pixels = pixels
+        self.last_rects = rects
+
+    def stats(self):
+        return {"enabled": self.enabled, "frames": self.frames,
+                "last_pixels": self.last_pixels, "last_rects": self.last_rects,
+                "avg_pixels": self.pixels_pushed / self.frames if self.frames else 0.0}
+
+
+class CachedLayer:
+    """A screen layer drawn once and redrawn only when its inputs change.
+
+    tegn(flate) draws the layer onto a surface. get(signatur) returns the cached
+    surface, redrawing it first if signatur differs from the last call (or after
+    invalidate()), so static screens cost one blit per frame."""
+
+    def __init__(self, tegn, size, alpha=False):
+        self.tegn = tegn
+        self.size = size
+        self.alpha = alpha  # Transparent layer drawn over something else
+        self.flate = None
+        self.signatur = None
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """Force a redraw, e.g. after a display mode change"""
+        self.flate = None
+
+    def get(self, signatur=None):
+        if self.flate is None or signatur != self.signatur:
+            if self.alpha:
+                flate = pygame.Surface(self.size, pygame.SRCALPHA)
+            else:
+                flate = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                flate = flate.convert_alpha() if self.alpha else flate.convert()
+            self.tegn(flate)
+            self.flate = flate
+            self.signatur = signatur
+            self.rebuilds += 1
+        return self.flate
+
+
+# Full-screen dimming overlays, one per (size, alpha)
+_dimming = {}
+
+def dimming_overlay(size, alpha=180):
+    overlay = _dimming.get((size, alpha))
+    if overlay is None:
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, alpha))  # Black with transparency
+        _dimming[(size, alpha)] = overlay
+    return overlay
+
+
+class ModalDialog:
+    """Centred dialog box over a dimmed screen.
+
+    The box with its border and static text lines is drawn once into a CachedLayer.
+    Dynamic lines (score, level number) are passed to draw() each frame as already
+    rendered surfaces, so they come from the text cache and a modal frame allocates
+    nothing new."""
+
+    def __init__(self, skjerm_size, dialog_size, bakgrunn, kant, statiske_linjer=()):
+        self.skjerm_size = skjerm_size
+        self.rect = pygame.Rect(0, 0, *dialog_size)
+        self.rect.center = (skjerm_size[0] // 2, skjerm_size[1] // 2)
+        self.bakgrunn = bakgrunn
+        self.kant = kant
+        self.statiske_linjer = statiske_linjer  # (surface, y in the dialog)
+        self.lag = CachedLayer(self._tegn, dialog_size)
+
+    def _tegn(self, flate):
+        flate.fill(self.bakgrunn)
+        pygame.draw.rect(flate, self.kant, flate.get_rect(), 2)
+        for bilde, y in self.statiske_linjer:
+            flate.blit(bilde, (self.rect.width // 2 - bilde.get_width() // 2, y))
+
+    def invalidate(self):
+        self.lag.invalidate()
+
+    def draw(self, skjerm, dynamiske_linjer=()):
+        skjerm.blit(dimming_overlay(self.skjerm_size), (0, 0))
+        skjerm.blit(self.lag.get(), self.rect)
+        for bilde, y in dynamiske_linjer:
+            skjerm.blit(bilde, (self.rect.centerx - bilde.get_width() // 2, self.rect.y + y))
+
+
+class BatchRenderer:
+    """Collects (image, position) pairs per draw-order layer and submits each layer
+    with a single Surface.blits() call, instead of one Python-level blit per sprite."""
+
+    def __init__(self):
+        self.lag = [[] for _ in range(ANTALL_LAG)]
+
+    def add(self, lag, bilde, pos):
+        self.lag[lag].append((bilde, pos))
+
+    def add_group(self, gruppe):
+        """Queue every sprite in a group on its own layer (sprite.layer)"""
+        lag = self.lag
+        for sprite in gruppe:
+            lag[sprite.layer].append((sprite.image, sprite.rect))
+
+    def flush(self, skjerm):
+        """Draw all queued layers back to front and empty the queues"""
+        for batch in self.lag:
+            if batch:
+                skjerm.blits(batch, doreturn=False)
+                batch.clear()
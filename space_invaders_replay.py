@@ -0,0 +1,177 @@
+"""Recording and bit-exact playback of games.
+
+A replay holds everything a GameSession needs to play a game again: the gameplay
+and effect seeds, the mode, tick rate, simulation clock and config at the start,
+and the input of every tick (movement keys, mouse position, mouse control and
+actions such as shots and weapon switches). Ticks are packed into a few bytes each
+and zlib-compressed. A checksum of the final game state is stored too, so
+playback can confirm it ended in exactly the same state.
+
+Playback runs on a new GameSession. Its random streams, tick rate and pools
+belong to that session alone, so a replay can be played in the middle of a
+running game or test without either affecting the other.
+
+    python space_invaders_replay.py last_replay.sirp            # play back headless and verify
+    python space_invaders_replay.py last_replay.sirp --render   # also draw every tick (draw benchmark)
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+import pygame
+from space_invaders_session import (GameSession, TickInput, load_images, load_fonts, default_high_scores,
+                                    SHOOT, SHOOT_LASER, SHOOT_SHOTGUN, WHIP, WEAPON_NORMAL, WEAPON_SHOTGUN)
+
+REPLAY_MAGIC = b'SIREPLAY'
+REPLAY_VERSJON = 1
+REPLAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'last_replay.sirp')
+
+# Actions in the order of their codes in the file - only append to this
+HANDLINGER = (SHOOT, SHOOT_LASER, SHOOT_SHOTGUN, WHIP, WEAPON_NORMAL, WEAPON_SHOTGUN)
+HANDLING_KODE = {navn: kode for kode, navn in enumerate(HANDLINGER)}
+
+# Tick flags
+VENSTRE = 1
+HOYRE = 2
+MUS = 4             # mouse_x is set
+MUSESTYRING = 8     # Mouse control was on
+NESTE_LEVEL = 16    # next_level() was called before this tick
+
+TIKK = struct.Struct('<BhB')  # flags, mouse_x, number of actions
+
+
+def state_checksum(session):
+    """Hash of the gameplay state: score, lives, clock, status and every sprite's type and rect"""
+    tilstand = [session.poeng, session.spiller.liv, round(session.tid_ms, 6), session.status,
+                session.LEVEL, round(session.score_multiplier, 6)]
+    tilstand += [(type(sprite).__name__, tuple(sprite.rect)) for sprite in session.alle_sprites]
+    return hashlib.sha1(repr(tilstand).encode()).hexdigest()
+
+
+class ReplayRecorder:
+    """Records one game from GameSession.start() on; call it after start()"""
+
+    def __init__(self, session):
+        self.header = {
+            'version': REPLAY_VERSJON,
+            'seed': session.seed,
+            'effekt_seed': session.effekt_seed,
+            'tick_rate': session.tick_rate,
+            'tid_ms': session.tid_ms,  # Simulation clock when the game started
+            'difficulty': session.VANSKELIGHETSGRAD,
+            'level_mode': session.LEVEL_MODE,
+            'level': session.LEVEL,
+            'config': copy.deepcopy(session.game_config),
+        }
+        self.ticks = bytearray()
+        self.antall = 0
+        self.neste_level = False
+
+    def next_level(self):
+        self.neste_level = True
+
+    def record(self, inputs, mouse_control=False):
+        """Record the input for one session.step()"""
+        flagg = (VENSTRE if inputs.left else 0) | (HOYRE if inputs.right else 0)
+        if inputs.mouse_x is not None:
+            flagg |= MUS
+        if mouse_control:
+            flagg |= MUSESTYRING
+        if self.neste_level:
+            flagg |= NESTE_LEVEL
+            self.neste_level = False
+        mouse_x = max(-32768, min(32767, int(inputs.mouse_x))) if inputs.mouse_x is not None else 0
+        self.ticks += TIKK.pack(flagg, mouse_x, len(inputs.actions))
+        self.ticks += bytes(HANDLING_KODE[handling] for handling in inputs.actions)
+        self.antall += 1
+
+    def save(self, path, session):
+        """Write the replay, with the final state checksum, atomically"""
+        header = dict(self.header, ticks=self.antall, checksum=state_checksum(session), poeng=session.poeng)
+        data = json.dumps(header).encode()
+        mappe = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=mappe)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(REPLAY_MAGIC + struct.pack('<I', len(data)) + data)
+                f.write(zlib.compress(bytes(self.ticks), 9))
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not save replay: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def load_replay(path):
+    """(header, ticks) where ticks is a list of (TickInput, mouse_control, next_level)"""
+    with open(path, 'rb') as f:
+        if f.read(len(REPLAY_MAGIC)) != REPLAY_MAGIC:
+            raise ValueError(f"{path} is not a replay")
+        lengde, = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(lengde))
+        data = zlib.decompress(f.read())
+    if header.get('version') != REPLAY_VERSJON:
+        raise ValueError(f"unsupported replay version {header.get('version')}")
+    ticks = []
+    pos = 0
+    while pos < len(data):
+        flagg, mouse_x, antall = TIKK.unpack_from(data, pos)
+        pos += TIKK.size
+        handlinger = [HANDLINGER[kode] for kode in data[pos:pos + antall]]
+        pos += antall
+        inputs = TickInput(bool(flagg & VENSTRE), bool(flagg & HOYRE), mouse_x if flagg & MUS else None, handlinger)
+        ticks.append((inputs, bool(flagg & MUSESTYRING), bool(flagg & NESTE_LEVEL)))
+    return header, ticks
+
+
+def play_replay(header, ticks, bilder, fonter=None, skjerm=None):
+    """Play a replay on a new headless session with its own random streams (nothing is saved to disk).
+    Draws every tick onto skjerm if given. Returns the session."""
+    config = copy.deepcopy(header['config'])
+    session = GameSession(bilder, config, copy.deepcopy(default_high_scores), fonter=fonter, tick_rate=header['tick_rate'], lagre=False)
+    session.tid_ms = header['tid_ms']
+    session.start(header['difficulty'], header['level_mode'], header['level'],
+                  seed=header['seed'], effekt_seed=header['effekt_seed'])
+    for inputs, mouse_control, neste_level in ticks:
+        if neste_level:
+            session.next_level()
+        config['mouse_control'] = mouse_control
+        session.step(inputs)
+        if skjerm is not None:
+            session.render(skjerm)
+    return session
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play back a Space Invaders replay headless")
+    parser.add_argument("replay", nargs="?", default=REPLAY_FILE)
+    parser.add_argument("--render", action="store_true", help="draw every tick to an offscreen surface")
+    args = parser.parse_args(argv)
+
+    assets_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+    header, ticks = load_replay(args.replay)
+    skjerm = fonter = None
+    if args.render:
+        skjerm = pygame.Surface((800, 600))
+        fonter = load_fonts(assets_folder)
+    bilder = load_images(assets_folder)
+
+    start = time.perf_counter()
+    session = play_replay(header, ticks, bilder, fonter, skjerm)
+    sekunder = time.perf_counter() - start
+
+    ok = state_checksum(session) == header['checksum']
+    print(f"{len(ticks)} ticks, score {session.poeng} (recorded {header['poeng']}), "
+          f"{'state matches' if ok else 'STATE DIFFERS'}")
+    print(f"{sekunder * 1000:.0f} ms, {sekunder * 1000 / max(1, len(ticks)):.3f} ms per tick")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
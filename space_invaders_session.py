@@ -0,0 +1,649 @@
+import os
+import math
+import pygame
+from space_invaders_classes import *
+from space_invaders_particles import ParticleSystem, StarField
+from space_invaders_collision import SpatialHash, groupcollide, spritecollide
+from space_invaders_render import BatchRenderer, LAG_BAKGRUNN, LAG_EFFEKTER
+from space_invaders_atlas import SpriteAtlas
+from space_invaders_assets import asset_pack
+from space_invaders_bootstrap import init_font
+
+# Sprites that move further than this in one tick (wrap-around, respawn) are not interpolated
+MAKS_INTERPOLERING = 100
+
+# Named actions a tick can carry (from keys or mouse buttons)
+SHOOT = 'shoot'                      # Space / W / Up - fire the selected weapon
+SHOOT_LASER = 'shoot_laser'          # Left mouse button - always the laser
+SHOOT_SHOTGUN = 'shoot_shotgun'      # Right mouse button - shotgun if unlocked
+WHIP = 'whip'                        # 3 / middle mouse button - electric whip if charged
+WEAPON_NORMAL = 'weapon_normal'      # 1 - select laser
+WEAPON_SHOTGUN = 'weapon_shotgun'    # 2 - select shotgun
+
+
+# Semi-transparent dotted aim line, built on first use
+_siktelinje = None
+
+def siktelinje():
+    global _siktelinje
+    if _siktelinje is None:
+        _siktelinje = pygame.Surface((2, HOYDE), pygame.SRCALPHA)
+        _siktelinje.fill((0, 0, 255, 30))  # Blue color with 30/255 alpha (almost transparent)
+        for y in range(0, HOYDE, 10):
+            if y % 20 == 0:  # Alternates between visible and invisible to create dotted effect
+                pygame.draw.line(_siktelinje, (0, 0, 255, 80), (0, y), (2, y+8), 2)
+    return _siktelinje
+
+
+# Size buckets an enemy image can be drawn at, for a base size and scale range
+def enemy_size_buckets(base, lav, hoy):
+    return range(rotation_atlas.size_bucket(int(base * lav)), rotation_atlas.size_bucket(int(base * hoy)) + 1,
+                 rotation_atlas.SIZE_STEP)
+
+
+# Every (image, size) pair the entities are drawn at unrotated
+def atlas_innhold(bilder):
+    par = [(bilder[navn], SPILLER_SIZE) for navn in ('spiller', 'spiller2', 'spiller3', 'spiller4')]
+    par += [(bilder['liv'], BONUS_SIZE),
+            (bilder['fiende'], NORMAL_IKON_SIZE),
+            (bilder['sterk_fiende'], STERK_IKON_SIZE)]
+    # Fiende: 70-120% of 40 px. SterkFiende: 80-130% of 50 px, but it starts out at Fiende's size
+    par += [(bilder['fiende'], (size, size)) for size in enemy_size_buckets(*FIENDE_SKALA)]
+    sterk = set(enemy_size_buckets(*FIENDE_SKALA)) | set(enemy_size_buckets(*STERK_FIENDE_SKALA))
+    par += [(bilder['sterk_fiende'], (size, size)) for size in sorted(sterk)]
+    return par
+
+
+class TickInput:
+    """Input state for a single simulation tick"""
+    def __init__(self, left=False, right=False, mouse_x=None, actions=()):
+        self.left = left
+        self.right = right
+        self.mouse_x = mouse_x
+        self.actions = tuple(actions)
+
+
+# Sound stand-in for headless sessions
+class StilleLyd:
+    def play(self, *args, **kwargs):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+
+# Load the entity images used by a session from the asset pack; convert only when a display exists
+def load_images(assets_folder):
+    pakke = asset_pack(assets_folder)
+    bilder = {}
+    for navn in ('spiller', 'spiller2', 'spiller3', 'spiller4', 'fiende', 'sterk_fiende', 'liv'):
+        bilde = pakke.image(navn)
+        if pygame.display.get_surface() is not None:
+            bilde = bilde.convert_alpha()
+        bilder[navn] = bilde
+    return bilder
+
+
+# Load the game fonts, falling back to system fonts if the sci-fi font is missing
+def load_fonts(assets_folder):
+    init_font()
+    try:
+        pakke = asset_pack(assets_folder)
+        if 'font' in pakke:
+            return {
+                'small': pakke.font('font', 18),
+                'medium': pakke.font('font', 24),
+                'large': pakke.font('font', 36),
+                'xlarge': pakke.font('font', 48),
+            }
+        # Fallback to another sci-fi-like font if available
+        fallback = 'courier' if 'courier' in pygame.font.get_fonts() else 'arial'
+        return {
+            'small': pygame.font.SysFont(fallback, 18),
+            'medium': pygame.font.SysFont(fallback, 24),
+            'large': pygame.font.SysFont(fallback, 36),
+            'xlarge': pygame.font.SysFont('arial', 48),
+        }
+    except Exception as e:
+        print(f"Could not load font: {e}")
+        return {
+            'small': pygame.font.SysFont('arial', 18),
+            'medium': pygame.font.SysFont('arial', 24),
+            'large': pygame.font.SysFont('arial', 36),
+            'xlarge': pygame.font.SysFont('arial', 48),
+        }
+
+
+class GameSession:
+    """All simulation state for one game, advanced one tick at a time with step()
+    and drawn separately with render(), so it can run without a window."""
+
+    def __init__(self, bilder, game_config, high_scores, lyder=None, fonter=None, tick_rate=STANDARD_TICK_RATE,
+                 lagre=True):
+        self.bilder = bilder
+        self.lagre = lagre  # Save config and high score changes to disk (off for replays)
+        self.spiller_bilder = (bilder['spiller'], bilder['spiller2'], bilder['spiller3'], bilder['spiller4'])
+        self.game_config = game_config
+        self.high_scores = high_scores
+        lyder = lyder or {}
+        self.skyte_lyd = lyder.get('skyte', StilleLyd())
+        self.eksplosjon_lyd = lyder.get('eksplosjon', StilleLyd())
+        self.liv_lyd = lyder.get('liv', StilleLyd())
+        self.fonter = fonter
+
+        # Fixed simulation tick - movement speeds are scaled to the tick rate
+        self.tick_rate = tick_rate
+        self.tick_ms = 1000 / tick_rate
+
+        # Everything the entities share lives in this session's own context: tick scale,
+        # random streams, projectile pools and the sprite atlas with every image scaled
+        # once, up front, to the sizes it is drawn at
+        pool_cap = game_config.get("projectile_pool_cap", 256)
+        self.kontekst = SpillKontekst(tick_rate, pool_cap, SpriteAtlas().build(atlas_innhold(bilder)))
+        self.kontekst.configure_pools(pool_cap, preallocate=min(pool_cap, 32))
+
+        # Simulation clock in milliseconds - replaces pygame.time.get_ticks() for gameplay
+        self.tid_ms = 0
+
+        # Sprite groups
+        self.alle_sprites = pygame.sprite.Group()
+        self.fiende_gruppe = pygame.sprite.Group()
+        self.skudd_gruppe = pygame.sprite.Group()
+        self.bonus_gruppe = pygame.sprite.Group()
+        self.fiende_prosjektil_gruppe = pygame.sprite.Group()
+        self.stjerner = StarField(game_config.get("star_count", 100), game_config.get("star_layers", 3),
+                                  tikk_skala=self.kontekst.tikk_skala)
+        self.partikler = ParticleSystem(tikk_skala=self.kontekst.tikk_skala)
+        self.batch = BatchRenderer()
+
+        # Collision broadphase, rebuilt every tick
+        self.fiende_hash = SpatialHash()
+        self.prosjektil_hash = SpatialHash()
+        self.bonus_hash = SpatialHash()
+
+        self.spiller = Spiller(self.kontekst, self.spiller_bilder[0])
+        self.alle_sprites.add(self.spiller)
+
+        # Sprite centres before the last tick, used to interpolate between ticks when rendering
+        self.forrige_pos = {}
+
+        # Game state
+        self.status = Spilltilstand.MENY
+        self.VANSKELIGHETSGRAD = 1
+        self.LEVEL_MODE = False
+        self.LEVEL = 1
+        self.poeng = 0
+        self.score_multiplier = 1.0
+        self.consecutive_hits = 0
+        self.aktive_skudd = []
+        self.show_shotgun_unlock = False
+
+        # Bonus timer
+        self.bonus_timer = 0
+        self.bonus_forsinkelse = 15000  # 15 seconds
+
+    def start(self, VANSKELIGHETSGRAD, LEVEL_MODE=False, LEVEL=1, seed=None, effekt_seed=None):
+        """Start a new game. seed drives gameplay randomness and effekt_seed the cosmetic effects
+        (defaults to seed); both are picked at random if not given and kept in self.seed and
+        self.effekt_seed, so any game can be recorded and replayed."""
+        if seed is None:
+            seed = int.from_bytes(os.urandom(4), 'little')
+        if effekt_seed is None:
+            effekt_seed = seed
+        self.seed, self.effekt_seed = seed, effekt_seed
+        self.kontekst.seed(seed, effekt_seed)
+        self.partikler.seed(effekt_seed)
+        self.VANSKELIGHETSGRAD = VANSKELIGHETSGRAD
+        self.LEVEL_MODE = LEVEL_MODE
+        self.LEVEL = LEVEL
+        self.show_shotgun_unlock = False
+
+        # Clear everything left over from the previous game
+        for sprite in self.alle_sprites:
+            sprite.kill()
+        self.partikler.clear()
+        self.aktive_skudd = []
+        self.spiller = Spiller(self.kontekst, self.spiller_bilder[0])
+        self.alle_sprites.add(self.spiller)
+        self.bonus_timer = self.tid_ms
+        self._start_round()
+
+    def next_level(self):
+        """Continue with the next level after LEVEL_COMPLETE"""
+        self._start_round()
+
+    def _start_round(self):
+        opprett_fiender(self.kontekst, self.LEVEL_MODE, self.LEVEL, self.VANSKELIGHETSGRAD, self.bilder['fiende'],
+                        self.bilder['sterk_fiende'], self.alle_sprites, self.fiende_gruppe, self.tid_ms)
+        # Reset score and multiplier
+        self.poeng = 0
+        self.score_multiplier = 1.0
+        self.consecutive_hits = 0
+        self.spiller.liv = 3
+        self.status = Spilltilstand.SPILLER
+
+    def _reset_multiplier(self):
+        self.score_multiplier, self.consecutive_hits = reset_multiplier()
+
+    def _game_over(self):
+        self.status = Spilltilstand.GAME_OVER
+        check_and_update_highscore(self.poeng, self.VANSKELIGHETSGRAD, self.high_scores, self.LEVEL, self.LEVEL_MODE,
+                                   self.lagre)
+
+    def _ny_fiende(self, sterk=False):
+        if sterk:
+            ny_fiende = SterkFiende(self.kontekst, self.bilder['sterk_fiende'], self.VANSKELIGHETSGRAD, self.tid_ms)
+        else:
+            ny_fiende = Fiende(self.kontekst, self.bilder['fiende'], self.VANSKELIGHETSGRAD, self.tid_ms)
+        self.alle_sprites.add(ny_fiende)
+        self.fiende_gruppe.add(ny_fiende)
+
+    def _skyt(self, weapon_override=None):
+        self.spiller.skyt(self.alle_sprites, self.skudd_gruppe, self.aktive_skudd, self.skyte_lyd,
+                          self.VANSKELIGHETSGRAD, self.fiende_gruppe, weapon_override, self.tid_ms)
+
+    def _handle_actions(self, actions):
+        max_level_reached = self.game_config["max_level_reached"]
+        for action in actions:
+            if action == SHOOT:
+                self._skyt()
+            elif action == SHOOT_LASER:
+                self._skyt("normal")
+            elif action == SHOOT_SHOTGUN:
+                # Only if shotgun is unlocked
+                if max_level_reached > 5:
+                    self._skyt("shotgun")
+            elif action == WHIP:
+                # Whip only fires if unlocked and charged - it never stays selected
+                if max_level_reached >= 10 and self.spiller.whip_charge >= self.spiller.whip_charge_threshold:
+                    self._skyt("electric whip")
+            elif action == WEAPON_NORMAL:
+                self.spiller.switch_weapon('normal', max_level_reached)
+            elif action == WEAPON_SHOTGUN:
+                self.spiller.switch_weapon('shotgun', max_level_reached)
+
+    def projectile_pool_stats(self):
+        return self.kontekst.pool_stats()
+
+    def update_background(self):
+        """Advance the background star field (runs in every state, menus included)"""
+        self.stjerner.update()
+
+    def step(self, inputs=None):
+        """Advance the simulation by one tick"""
+        if inputs is None:
+            inputs = TickInput()
+        self.tid_ms += self.tick_ms
+        self.update_background()
+
+        if self.status != Spilltilstand.SPILLER:
+            return
+
+        self.forrige_pos = {sprite: sprite.rect.center for sprite in self.alle_sprites}
+        # Shots fired last tick are only tracked for one tick, so pooled shots aren't kept alive here
+        self.aktive_skudd.clear()
+        self._handle_actions(inputs.actions)
+
+        # Update player with current score and skin images
+        mouse_control = self.game_config.get("mouse_control", False)
+        self.spiller.update(self.poeng, self.spiller_bilder, mouse_control, inputs)
+
+        # Update enemies
+        for enemy in self.fiende_gruppe:
+            if self.VANSKELIGHETSGRAD == 4:
+                enemy.update(self.VANSKELIGHETSGRAD, self.alle_sprites, self.fiende_prosjektil_gruppe, self.tid_ms)
+            else:
+                enemy.update()
+
+        # Update shots
+        for shot in self.skudd_gruppe:
+            shot.update(self._reset_multiplier)
+
+        # Update other sprites with special handling for ElectricWhip
+        for sprite in list(self.alle_sprites):
+            if sprite in self.skudd_gruppe or sprite in self.fiende_gruppe or sprite is self.spiller:
+                continue
+            if isinstance(sprite, ElectricWhip):
+                sprite.update(self.fiende_gruppe, self.alle_sprites, self.eksplosjon_lyd, self.score_multiplier, self.tid_ms,
+                              self.partikler)
+                self._process_whip_hits(sprite)
+            elif isinstance(sprite, (Eksplosjon, ExplosiveEffect)):
+                sprite.update(self.tid_ms)
+            else:
+                sprite.update()
+        self.partikler.update()
+
+        self._check_collisions()
+
+        if self.status == Spilltilstand.SPILLER:
+            self._check_level_complete()
+
+    def _process_whip_hits(self, whip):
+        # Process damage and scoring for hit enemies, in group order so runs are reproducible
+        for fiende in list(self.fiende_gruppe):
+            if fiende in whip.enemies_hit:
+                # Increase score multiplier for every hit
+                self.score_multiplier, self.consecutive_hits = increase_multiplier(self.score_multiplier, self.consecutive_hits)
+                point_gain = int(fiende.point_value * self.score_multiplier)
+                self.poeng += point_gain
+
+                # Create explosion at enemy position
+                eksplosjon = Eksplosjon(fiende.rect.center, self.tid_ms)
+                self.alle_sprites.add(eksplosjon)
+
+                # Remove the enemy and create a replacement of the same type
+                fiende.kill()
+                self._ny_fiende(isinstance(fiende, SterkFiende))
+
+        # Forget enemies that are gone to avoid handling them twice
+        whip.enemies_hit.clear()
+
+    def _check_collisions(self):
+        spiller = self.spiller
+
+        # Check for collisions between shots and enemies
+        treff = groupcollide(self.skudd_gruppe, self.fiende_gruppe, True, False,
+                             self.fiende_hash.build(self.fiende_gruppe))
+        processed_enemies = set()
+        for skudd, fiender in treff.items():
+            skudd.truffet_fiende = True
+            if isinstance(skudd, ExplosiveShot):
+                points, drept = skudd.explode(self.alle_sprites, self.fiende_gruppe, self.poeng,
+                                              self.score_multiplier, self.eksplosjon_lyd, self.tid_ms,
+                                              self.fiende_hash)
+                self.poeng += points
+                # Replace every enemy the blast killed with one of the same type
+                for enemy_type in drept:
+                    self._ny_fiende(enemy_type == "SterkFiende")
+                continue
+            for fiende in fiender:
+                if fiende in processed_enemies:
+                    continue
+                processed_enemies.add(fiende)
+                fiende.treff += 1
+                if fiende.treff >= fiende.max_treff:
+                    self.score_multiplier, self.consecutive_hits = increase_multiplier(self.score_multiplier, self.consecutive_hits)
+                    point_gain = int(fiende.point_value * self.score_multiplier)
+                    self.poeng += point_gain
+                    # Increase electric whip charge with earned points
+                    spiller.whip_charge = min(spiller.whip_charge + point_gain, spiller.whip_charge_threshold)
+                    eksplosjon = Eksplosjon(fiende.rect.center, self.tid_ms)
+                    self.alle_sprites.add(eksplosjon)
+                    self.eksplosjon_lyd.play(maxtime=0, fade_ms=0)
+                    fiende.kill()
+                    # Killed enemies are always replaced by a normal enemy
+                    self._ny_fiende()
+
+        # In Impossible mode, check for collisions between player and enemy projectiles
+        if self.VANSKELIGHETSGRAD == 4:
+            treff_prosjektil = spritecollide(spiller, self.fiende_prosjektil_gruppe, True,
+                                             self.prosjektil_hash.build(self.fiende_prosjektil_gruppe))
+            for hit in treff_prosjektil:
+                spiller.liv -= 1
+                if spiller.liv <= 0:
+                    self._game_over()
+
+        # Check if enemies have reached the bottom
+        rng = self.kontekst.rng
+        for fiende in self.fiende_gruppe:
+            if fiende.rect.top > HOYDE:
+                fiende.rect.x = rng.randrange(BREDDE - fiende.rect.width)
+                fiende.rect.y = rng.randrange(-100, -40)
+
+                # Adjust speed based on difficulty
+                if self.VANSKELIGHETSGRAD == 1:
+                    fiende.hastighet = rng.randrange(1, 2)
+                elif self.VANSKELIGHETSGRAD == 2:
+                    fiende.hastighet = rng.randrange(1, 3)
+                else:  # Level 3 or higher
+                    fiende.hastighet = rng.randrange(1, 4)
+                spiller.liv -= 1
+                if spiller.liv <= 0:
+                    self._game_over()
+
+        # Generate bonus
+        if self.tid_ms - self.bonus_timer > self.bonus_forsinkelse:
+            self.bonus_timer = self.tid_ms
+            bonus = Kraftbonus(self.kontekst, self.bilder['liv'])
+            self.alle_sprites.add(bonus)
+            self.bonus_gruppe.add(bonus)
+
+        # Check for collisions between player and bonus
+        treff_bonus = spritecollide(spiller, self.bonus_gruppe, True, self.bonus_hash.build(self.bonus_gruppe))
+        for hit in treff_bonus:
+            self.liv_lyd.play(maxtime=0, fade_ms=0)
+            spiller.liv += 1
+            # Visual effect when bonus is collected
+            self.partikler.spawn_explosion(hit.rect.center, 10)
+
+    def _check_level_complete(self):
+        if not self.LEVEL_MODE:
+            return
+        level_reqs = set_level_requirements(self.LEVEL)
+        if self.poeng < level_reqs["target_score"]:
+            return
+        check_and_update_highscore(self.poeng, self.VANSKELIGHETSGRAD, self.high_scores, self.LEVEL, self.LEVEL_MODE,
+                                   self.lagre)
+
+        new_level = self.LEVEL + 1
+        game_config = self.game_config
+
+        # Update max reached level
+        if new_level > game_config["max_level_reached"]:
+            game_config["max_level_reached"] = new_level
+
+            # Check for new skins based on level
+            if new_level == 5 and "level5_skin" not in game_config["unlocked_skins"]:
+                game_config["unlocked_skins"].append("level5_skin")
+
+            # Only show the unlock notification if the shotgun is being unlocked for the first time
+            if new_level == 6 and not game_config.get("shotgun_unlocked", False):
+                self.show_shotgun_unlock = True
+                game_config["shotgun_unlocked"] = True
+
+            if self.lagre:
+                save_config(game_config)
+
+        self.LEVEL = new_level
+        self.status = Spilltilstand.LEVEL_COMPLETE
+
+    def _interpolert(self, sprite, forrige, alpha):
+        # Top-left blit position between the previous and current tick
+        x, y = sprite.rect.center
+        gammel = forrige.get(sprite)
+        if gammel is not None and abs(x - gammel[0]) < MAKS_INTERPOLERING and abs(y - gammel[1]) < MAKS_INTERPOLERING:
+            x = round(gammel[0] + (x - gammel[0]) * alpha)
+            y = round(gammel[1] + (y - gammel[1]) * alpha)
+        return (x - sprite.rect.width // 2, y - sprite.rect.height // 2)
+
+    def _queue_interpolated(self, gruppe, forrige, alpha):
+        # Queue each sprite on its draw-order layer at its interpolated position.
+        # Sprites that did not move since the previous tick are queued with their own rect.
+        lag = self.batch.lag
+        hent = forrige.get
+        maks = MAKS_INTERPOLERING
+        for sprite in gruppe:
+            rect = sprite.rect
+            pos = rect
+            gammel = hent(sprite)
+            if gammel is not None and alpha < 1:
+                x, y = rect.center
+                gx, gy = gammel
+                if (x != gx or y != gy) and -maks < x - gx < maks and -maks < y - gy < maks:
+                    pos = (round(gx + (x - gx) * alpha) - rect.width // 2,
+                           round(gy + (y - gy) * alpha) - rect.height // 2)
+            lag[sprite.layer].append((sprite.image, pos))
+            if sprite.layer == LAG_EFFEKTER and isinstance(sprite, ElectricWhip):
+                lag[LAG_EFFEKTER] += sprite.beam_blits()
+
+    def render_background(self, skjerm, alpha=1.0):
+        """Black background with the star field"""
+        skjerm.fill(SVART)
+        self.stjerner.draw(skjerm, alpha)
+
+    def render(self, skjerm, alpha=1.0):
+        """Draw the running game: background, sprites and HUD.
+        alpha is how far the display is between the previous tick (0) and the current one (1)."""
+        self.render_background(skjerm, alpha)
+        spiller = self.spiller
+        spiller_x = self._interpolert(spiller, self.forrige_pos, alpha)[0] + spiller.rect.width // 2
+
+        # Draw aim line for the player at level 1 and 2, centered with the player
+        if self.VANSKELIGHETSGRAD < 3:
+            self.batch.add(LAG_BAKGRUNN, siktelinje(), (spiller_x - 1, 0))
+
+        # All sprites go out in one blits() call per layer
+        self._queue_interpolated(self.alle_sprites, self.forrige_pos, alpha)
+        self.batch.flush(skjerm)
+        self.partikler.draw(skjerm, alpha)
+
+        if self.fonter is not None:
+            self._render_hud(skjerm)
+
+    def _render_hud(self, skjerm):
+        spiller = self.spiller
+        game_font_small = self.fonter['small']
+        game_font_medium = self.fonter['medium']
+        info_font = game_font_small
+        game_config = self.game_config
+        VANSKELIGHETSGRAD, LEVEL, LEVEL_MODE = self.VANSKELIGHETSGRAD, self.LEVEL, self.LEVEL_MODE
+
+        # Show points and high score
+        high_score = get_current_high_score(VANSKELIGHETSGRAD, LEVEL, LEVEL_MODE, self.high_scores)
+        poeng_tekst = text_cache.render(game_font_small, f"Poeng: {self.poeng}", True, HVIT)
+        if not LEVEL_MODE:  # Only show high score in regular mode
+            high_score_tekst = text_cache.render(game_font_small, f"High Score: {high_score}", True, (255, 215, 0))  # Gold color for high score
+            skjerm.blit(high_score_tekst, (BREDDE - high_score_tekst.get_width() - 10, 10))
+
+        skjerm.blit(poeng_tekst, (10, 10))
+
+        # Show lives
+        liv_tekst = text_cache.render(game_font_small, f"Liv: {spiller.liv}", True, HVIT)
+        skjerm.blit(liv_tekst, (10, 40))
+
+        # Show difficulty level
+        if LEVEL_MODE:
+            # In level mode, show the current level instead of difficulty
+            level_tekst = text_cache.render(game_font_small, f"Level: {LEVEL}", True, BLA)
+            skjerm.blit(level_tekst, (10, 70))
+        else:
+            # In regular mode, show difficulty
+            if VANSKELIGHETSGRAD == 1:
+                vanskelig_tekst = text_cache.render(game_font_small, "Nivå: Lett", True, GRONN)
+            elif VANSKELIGHETSGRAD == 2:
+                vanskelig_tekst = text_cache.render(game_font_small, "Nivå: Middels", True, (255, 255, 0))
+            elif VANSKELIGHETSGRAD == 3:
+                vanskelig_tekst = text_cache.render(game_font_small, "Nivå: Vanskelig", True, ROD)
+            else:
+                vanskelig_tekst = text_cache.render(game_font_small, "Nivå: Umulig", True, (255, 0, 255))
+            skjerm.blit(vanskelig_tekst, (10, 70))
+
+        # Show level progress (only in level mode)
+        if LEVEL_MODE:
+            draw_level_progress(skjerm, self.poeng, LEVEL, game_font_small)
+
+        # Show multiplier with prominent positioning at the top-right
+        if self.score_multiplier > 1.0:
+            multiplier_text = text_cache.render(game_font_medium, f"x{self.score_multiplier:.1f}", True, (255, 215, 0))  # Brighter gold color
+            skjerm.blit(multiplier_text, (BREDDE - multiplier_text.get_width() - 10, 40))
+
+        # Show enemy point values
+        try:
+            draw_enemy_points(skjerm, self.bilder['fiende'], self.bilder['sterk_fiende'], self.score_multiplier,
+                              game_font_small, VANSKELIGHETSGRAD, LEVEL_MODE, LEVEL, self.kontekst.atlas)
+        except Exception as e:
+            print(f"Failed to draw enemy points: {e}")
+
+        # Show currently selected weapon - stacked vertically with styling matching the main menu
+        weapon_panel_width = 130
+        weapon_panel_height = 35
+        weapon_spacing = 10  # Vertical spacing between panels
+
+        # Position in top-right corner with some padding, below the multiplier display
+        weapons_start_x = BREDDE - weapon_panel_width - 10
+        weapons_start_y = 120
+
+        shotgun_unlocked = game_config["max_level_reached"] > 5
+        whip_unlocked = game_config["max_level_reached"] >= 10
+
+        # Define weapon types and their properties
+        weapon_types = [
+            {
+                "name": "Laser",
+                "key": "1",
+                "type": "normal",
+                "bg_color": (40, 60, 50),
+                "border_color": pastel_colors["easy"],
+                "text_color": pastel_colors["easy"],
+                "unlocked": True
+            },
+            {
+                "name": "Hagle",
+                "key": "2",
+                "type": "shotgun",
+                "bg_color": (60, 50, 40) if shotgun_unlocked else (50, 50, 50),
+                "border_color": pastel_colors["medium"] if shotgun_unlocked else (120, 120, 120),
+                "text_color": pastel_colors["medium"] if shotgun_unlocked else (150, 150, 150),
+                "unlocked": shotgun_unlocked,
+                "locked_text": "Hagle [Lvl 5+]"
+            },
+            {
+                "name": "Pisk",
+                "key": "3",
+                "type": "electric whip",
+                "bg_color": (60, 40, 40) if whip_unlocked else (50, 50, 50),
+                "border_color": pastel_colors["hard"] if whip_unlocked else (120, 120, 120),
+                "text_color": pastel_colors["hard"] if whip_unlocked else (150, 150, 150),
+                "unlocked": whip_unlocked,
+                "charged": spiller.whip_charge >= spiller.whip_charge_threshold,
+                "locked_text": "Pisk [Lvl 10+]"
+            }
+        ]
+
+        for i, weapon in enumerate(weapon_types):
+            if weapon["type"] == "electric whip":
+                is_selected = weapon.get("charged", False) and weapon["unlocked"]
+            else:
+                is_selected = (spiller.current_weapon == weapon["type"])
+            panel_y = weapons_start_y + i * (weapon_panel_height + weapon_spacing)
+
+            # Draw the weapon panel background
+            pygame.draw.rect(skjerm, weapon["bg_color"],
+                             (weapons_start_x, panel_y, weapon_panel_width, weapon_panel_height))
+
+            # Only show charge meter if the whip is unlocked
+            if weapon["type"] == "electric whip" and weapon["unlocked"]:
+                # Draw charging progress
+                charge_ratio = spiller.whip_charge / spiller.whip_charge_threshold
+                fill_width = int(weapon_panel_width * min(max(charge_ratio, 0), 1))
+                if spiller.whip_charge >= spiller.whip_charge_threshold:
+                    # Create pulsing effect when fully charged
+                    pulse = (math.sin(self.tid_ms * 0.01) + 1) / 2
+                    factor = 1.0 + 0.5 * pulse
+                    fill_color = (min(255, int(ROD[0] * factor)),
+                                  min(255, int(ROD[1] * factor)),
+                                  min(255, int(ROD[2] * factor)))
+                    # Draw a glowing border in sync with the pulse
+                    glow = (min(255, int(ROD[0] * (1.0+0.7*pulse))),
+                            min(255, int(ROD[1] * (1.0+0.7*pulse))),
+                            min(255, int(ROD[2] * (1.0+0.7*pulse))))
+                    pygame.draw.rect(skjerm, glow, (weapons_start_x-2, panel_y-2, weapon_panel_width+4, weapon_panel_height+4), 2)
+                else:
+                    fill_color = ROD
+                pygame.draw.rect(skjerm, fill_color, (weapons_start_x, panel_y, fill_width, weapon_panel_height))
+
+            # Draw panel border
+            pygame.draw.rect(skjerm, weapon["border_color"],
+                             (weapons_start_x, panel_y, weapon_panel_width, weapon_panel_height),
+                             3 if is_selected else 1)
+
+            # Draw weapon text centered - use locked text if not unlocked
+            if weapon["unlocked"]:
+                weapon_text = f"{weapon['name']} [{weapon['key']}]"
+            else:
+                weapon_text = weapon.get("locked_text", f"{weapon['name']} [Låst]")
+
+            text_render = text_cache.render(info_font, weapon_text, True,
+                                            HVIT if is_selected else weapon["text_color"])
+            skjerm.blit(text_render, (weapons_start_x + weapon_panel_width//2 - text_render.get_width()//2,
+                                      panel_y + weapon_panel_height//2 - text_render.get_height()//2))
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pygame
+from space_invaders_bootstrap import init_mixer
+
+# Rendered sounds are cached here, keyed by sound name, parameters and sample rate
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sound_cache')
+CACHE_VERSJON = 1  # Bump when a synth function changes so old cache files are ignored
+
+# Registered synth functions: name -> function(rate, **params) returning samples in [-1, 1]
+synther = {}
+
+
+def synth(navn):
+    def registrer(funksjon):
+        synther[navn] = funksjon
+        return funksjon
+    return registrer
+
+
+def _tid(rate, varighet):
+    return np.arange(int(rate * varighet)) / rate
+
+
+@synth('eksplosjon')
+def eksplosjon(rate, varighet=0.27, decay=0.23, seed=1):
+    """Noise burst with a linear fade over `decay` seconds"""
+    t = _tid(rate, varighet)
+    stoy = np.random.default_rng(seed).uniform(-1, 1, len(t))
+    return stoy * np.clip(1 - t / decay, 0, 1)
+
+
+@synth('bonus')
+def bonus(rate, varighet=0.18, start_hz=2100, slutt_hz=7700, volum=0.8):
+    """Tone sweeping linearly from start_hz to slutt_hz"""
+    t = _tid(rate, varighet)
+    frekvens = start_hz + (slutt_hz - start_hz) * t / varighet
+    fase = 2 * np.pi * np.cumsum(frekvens) / rate
+    return volum * np.sin(fase)
+
+
+@synth('skyte')
+def skyte(rate, varighet=0.09, pitch=5500, decay=0.023, volum=0.8):
+    """Short square-wave "thock" that dies out over `decay` seconds"""
+    t = _tid(rate, varighet)
+    firkant = np.where((t * pitch) % 1 < 0.5, 1.0, -1.0)
+    return volum * firkant * np.clip(1 - t / decay, 0, 1)
+
+
+def _cache_fil(navn, rate, params):
+    nokkel = json.dumps([CACHE_VERSJON, navn, rate, sorted(params.items())])
+    return os.path.join(CACHE_DIR, f"{navn}-{hashlib.sha1(nokkel.encode()).hexdigest()[:16]}.npy")
+
+
+def render(navn, rate=44100, **params):
+    """16-bit mono PCM for a registered sound, from the disk cache when possible"""
+    fil = _cache_fil(navn, rate, params)
+    try:
+        return np.load(fil)
+    except (OSError, ValueError):
+        pass
+    pcm = (np.clip(synther[navn](rate, **params), -1, 1) * 32767).astype(np.int16)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.npy', dir=CACHE_DIR)
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, pcm)
+        os.replace(tmp, fil)
+    except OSError as e:
+        print(f"Could not cache sound {navn}: {e}")
+    return pcm
+
+
+def _til_mixer(pcm, size, channels):
+    # Convert 16-bit mono samples to the mixer's sample format and channel count
+    if size == 8:
+        pcm = ((pcm.astype(np.int32) >> 8) + 128).astype(np.uint8)
+    elif size == -8:
+        pcm = (pcm >> 8).astype(np.int8)
+    elif size == 16:
+        pcm = (pcm.astype(np.int32) + 32768).astype(np.uint16)
+    elif size == 32:
+        pcm = pcm.astype(np.float32) / 32768
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+    return np.ascontiguousarray(pcm)
+
+
+def lag_lyd(navn, **params):
+    """pygame Sound for a registered synth sound, rendered at the mixer's format"""
+    init_mixer()
+    rate, size, channels = pygame.mixer.get_init()
+    return pygame.mixer.Sound(buffer=_til_mixer(render(navn, rate, **params), size, channels).tobytes())
+
+
+class LazySound:
+    """Stands in for a synth Sound and only renders it the first time it is played"""
+
+    def __init__(self, navn, **params):
+        self.navn = navn
+        self.params = params
+        self.volum = 1.0
+        self.lyd = None
+
+    def get(self):
+        if self.lyd is None:
+            self.lyd = lag_lyd(self.navn, **self.params)
+            self.lyd.set_volume(self.volum)
+        return self.lyd
+
+    def play(self, *args, **kwargs):
+        return self.get().play(*args, **kwargs)
+
+    def set_volume(self, volume):
+        self.volum = volume
+        if self.lyd is not None:
+            self.lyd.set_volume(volume)
+
+    def get_volume(self):
+        return self.volum
@@ -0,0 +1,108 @@
+import atexit
+import copy
+import json
+import os
+import stat
+import tempfile
+import threading
+
+# Process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _fil_modus(path):
+    # Permissions for a file written over path: those of the file being replaced,
+    # or what open() would give a new file
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+class JsonStore:
+    """A JSON file kept in memory, with debounced write-behind saves.
+
+    load() reads the file once; after that the in-memory document is the source
+    of truth. save() serializes the document straight away (so later changes to it
+    don't race the writer) and a background timer writes it out after `delay`
+    seconds. Saves that arrive before the timer fires are coalesced into one write.
+    Writes go to a temporary file in the same folder that is then renamed over the
+    real one, so a crash mid-write leaves the previous file intact. flush() writes
+    any pending save immediately; it runs on quit and at interpreter exit."""
+
+    def __init__(self, path, defaults, delay=0.5):
+        self.path = path
+        self.defaults = defaults
+        self.delay = delay
+        self.data = None
+        self.writes = 0  # Files actually written
+        self.saves = 0   # save() calls
+        self._ventende = None  # Latest serialized document not yet on disk
+        self._timer = None
+        self._lock = threading.Lock()
+        self._skrive_lock = threading.Lock()  # Keeps writes in order
+        atexit.register(self.flush)
+
+    def load(self):
+        """The stored document, read from disk on first use (defaults if missing or unreadable)"""
+        if self.data is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self.data = json.load(f)
+            except FileNotFoundError:
+                # Create the file with the defaults
+                self.save(copy.deepcopy(self.defaults))
+            except (OSError, ValueError):
+                self.data = copy.deepcopy(self.defaults)
+        return self.data
+
+    def save(self, data=None):
+        """Mark the document dirty (replacing it with data if given) and schedule a write"""
+        if data is not None:
+            self.data = data
+        tekst = json.dumps(self.data, indent=4)
+        with self._lock:
+            self.saves += 1
+            self._ventende = tekst
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    @property
+    def dirty(self):
+        return self._ventende is not None
+
+    def flush(self):
+        """Write the pending save now, if there is one"""
+        with self._skrive_lock:
+            with self._lock:
+                tekst, self._ventende = self._ventende, None
+                timer, self._timer = self._timer, None
+            if timer is not None and timer is not threading.current_thread():
+                timer.cancel()
+            if tekst is not None:
+                self._skriv(tekst)
+
+    def _skriv(self, tekst):
+        mappe = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(self.path) + '.', suffix='.tmp', dir=mappe)
+        try:
+            os.chmod(tmp, _fil_modus(self.path))  # mkstemp creates the file as 0600
+            with os.fdopen(fd, 'w') as f:
+                f.write(tekst)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save {self.path}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self.writes += 1
+
+    def stats(self):
+        return {"saves": self.saves, "writes": self.writes, "dirty": self.dirty}